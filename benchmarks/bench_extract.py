@@ -0,0 +1,94 @@
+"""Compares the query-based symbol extraction engine against the recursive visitor.
+
+Usage: python benchmarks/bench_extract.py PATH [PATH ...] [--repeat N]
+
+Every file is parsed once per engine (tree-sitter parsing itself is shared and excluded
+from the timings), the extracted symbols are checked for equality, and per-language
+timings plus the overall speedup are printed.
+"""
+import argparse
+import pathlib
+import sys
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from ccb.config import config  # noqa: E402
+from ccb.parsers import PARSER_SPECS  # noqa: E402
+from ccb.parsers.universal import UniversalParser  # noqa: E402
+from ccb.walker import Walker  # noqa: E402
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("paths", nargs="+")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    engines = {}
+    for lang_id, exts in PARSER_SPECS:
+        engines[lang_id] = (UniversalParser(lang_id, exts, engine="visitor"), UniversalParser(lang_id, exts, engine="query"))
+
+    trees = []
+    walker = Walker(config.include, config.exclude)
+    for path in args.paths:
+        path = pathlib.Path(path)
+        files = [path] if path.is_file() else [f for _, fs in walker.walk(path) for f in fs]
+        for f in files:
+            spec = next((s for s in PARSER_SPECS if f.suffix in s[1]), None)
+            if not spec:
+                continue
+            try:
+                source = f.read_bytes()
+            except OSError:
+                continue
+            visitor, _ = engines[spec[0]]
+            trees.append((spec[0], f, source, visitor.parser.parse(source)))
+
+    timings = {}
+    mismatches = 0
+    for lang_id, f, source, tree in trees:
+        visitor, query = engines[lang_id]
+        per_engine = []
+        results = []
+        for parser in (visitor, query):
+            best = float("inf")
+            for _ in range(args.repeat):
+                symbols = []
+                parser._source = source  # normally set by extract_all
+                start = time.perf_counter()
+                try:
+                    if parser is visitor:
+                        parser._visit(tree.root_node, "", symbols)
+                    else:
+                        parser._extract(tree.root_node, symbols)
+                except RecursionError:
+                    symbols = None
+                    best = float("nan")
+                    break
+                best = min(best, time.perf_counter() - start)
+            per_engine.append(best)
+            results.append([s.to_dict() for s in symbols] if symbols is not None else None)
+
+        if results[0] is not None and results[0] != results[1]:
+            mismatches += 1
+            print(f"MISMATCH {f}")
+        stats = timings.setdefault(lang_id, [0, 0.0, 0.0])
+        stats[0] += 1
+        if per_engine[0] == per_engine[0]:  # skip files the visitor couldn't handle (RecursionError)
+            stats[1] += per_engine[0]
+            stats[2] += per_engine[1]
+
+    print(f"{'language':<12}{'files':>8}{'visitor s':>12}{'query s':>12}{'speedup':>10}")
+    total_v = total_q = 0.0
+    for lang_id, (count, v, q) in sorted(timings.items()):
+        total_v += v
+        total_q += q
+        print(f"{lang_id:<12}{count:>8}{v:>12.3f}{q:>12.3f}{(v / q if q else 0):>9.1f}x")
+    print(f"{'total':<12}{len(trees):>8}{total_v:>12.3f}{total_q:>12.3f}{(total_v / total_q if total_q else 0):>9.1f}x")
+    print(f"{mismatches} files with differing output")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
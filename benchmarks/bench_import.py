@@ -0,0 +1,72 @@
+"""Measures CLI startup cost and checks that light commands stay off the heavy imports.
+
+Usage: python benchmarks/bench_import.py [--repeat N]
+
+Reports the median `python -X importtime` cumulative time for `ccb.cli` and the median wall
+time of `ccb clean` on an empty folder, and fails if `clean` or `init` pulled in tree-sitter
+or httpx.
+"""
+import argparse
+import pathlib
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO = pathlib.Path(__file__).resolve().parent.parent
+HEAVY = ("tree_sitter", "httpx")
+
+PROBE = """
+import sys
+from ccb.cli import main
+try:
+    main({argv!r})
+except SystemExit:
+    pass
+heavy = sorted({{m.split('.')[0] for m in sys.modules if m.startswith({heavy!r})}})
+print("HEAVY:" + ",".join(heavy))
+"""
+
+
+def run(code: str, cwd: str, stdin: str = "") -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, "-c", code], cwd=cwd, input=stdin, capture_output=True,
+                          text=True, env={"PYTHONPATH": str(REPO), "PATH": ""})
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=10)
+    args = ap.parse_args()
+
+    import_us = []
+    for _ in range(args.repeat):
+        out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import ccb.cli"],
+                             capture_output=True, text=True, env={"PYTHONPATH": str(REPO)})
+        line = [l for l in out.stderr.splitlines() if l.rstrip().endswith("| ccb.cli")][-1]
+        import_us.append(int(line.split("|")[1]))
+
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        clean_s = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            result = run(PROBE.format(argv=["clean", "."], heavy=HEAVY), tmp)
+            clean_s.append(time.perf_counter() - start)
+        heavy = result.stdout.strip().splitlines()[-1]
+        print(f"ccb clean loaded: {heavy[6:] or 'nothing heavy'}")
+        failures += heavy != "HEAVY:"
+
+        # Accept every prompt default (plus a dummy answer for the API key prompt if asked)
+        result = run(PROBE.format(argv=["init"], heavy=HEAVY), tmp, stdin="\n" * 10)
+        heavy = result.stdout.strip().splitlines()[-1]
+        print(f"ccb init loaded: {heavy[6:] or 'nothing heavy'}")
+        failures += heavy != "HEAVY:"
+
+    print(f"import ccb.cli: median {statistics.median(import_us) / 1000:.1f} ms")
+    print(f"ccb clean (process wall time): median {statistics.median(clean_s) * 1000:.1f} ms")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
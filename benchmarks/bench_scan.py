@@ -0,0 +1,187 @@
+"""End-to-end scan benchmark on a synthetic repository with a mock LLM server.
+
+Usage: python benchmarks/bench_scan.py [--files N] [--mix py=40,ts=20,...] [--depth D] [--symbols S]
+                                       [--doc-ratio R] [--latency SEC] [--provider ollama|openai]
+                                       [--repeat N] [--output results.json] [--compare baseline.json]
+
+Each run generates a fresh repository and runs the CLI as a subprocess for every phase:
+
+  cold      first scan: parse everything, summarize every undocumented symbol
+  warm      no-op rescan: nothing changed
+  edit      rescan after appending a function to one file
+  markdown  rescan after deleting every context file (render only)
+  clean     ccb clean
+
+Wall time, peak RSS and LLM requests/tokens are recorded per phase. With --repeat, the
+median wall time and the highest peak RSS over all runs are reported. Results are
+written as JSON; --compare prints the ratio against an earlier results file.
+"""
+import argparse
+import json
+import os
+import pathlib
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+HERE = pathlib.Path(__file__).resolve().parent
+REPO = HERE.parent
+sys.path.insert(0, str(HERE))
+
+from mock_llm import MockLLM  # noqa: E402
+from synth import DEFAULT_MIX, generate  # noqa: E402
+
+PHASES = ["cold", "warm", "edit", "markdown", "clean"]
+
+
+def run_cli(args: List[str], cwd: pathlib.Path, env: Dict[str, str], log) -> Dict:
+    """Runs `ccb ARGS` and returns wall time and peak RSS of that process alone."""
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-m", "ccb.cli", *args], cwd=cwd, env=env, stdout=log, stderr=log)
+    # wait4 gives this child's own rusage; RUSAGE_CHILDREN would accumulate across phases
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"ccb {' '.join(args)} exited with {proc.returncode}")
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss_kib = usage.ru_maxrss / 1024 if sys.platform == "darwin" else usage.ru_maxrss
+    return {"wall_s": round(wall, 4), "peak_rss_mb": round(rss_kib / 1024, 1)}
+
+
+def run_once(args, workdir: pathlib.Path) -> Dict:
+    repo = workdir / "repo"
+    info = generate(repo, args.files, args.mix, args.depth, args.symbols, args.doc_ratio, args.seed)
+    results = {}
+    with MockLLM(latency=args.latency) as mock, open(workdir / "ccb.log", "w") as log:
+        env = dict(os.environ, PYTHONPATH=str(REPO), LLM_PROVIDER=args.provider, LLM_MODEL="bench",
+                   LLM_BASE_URL=mock.url + ("/v1" if args.provider == "openai" else ""), LLM_API_KEY="bench")
+        if args.jobs is not None:
+            env["SCAN_JOBS"] = str(args.jobs)
+
+        def phase(name: str, cli_args: List[str]):
+            before = mock.stats()
+            log.write(f"=== {name} ===\n")
+            log.flush()
+            result = run_cli(cli_args, repo, env, log)
+            after = mock.stats()
+            result["llm_requests"] = after["requests"] - before["requests"]
+            result["llm_prompt_tokens"] = after["prompt_tokens"] - before["prompt_tokens"]
+            results[name] = result
+
+        phase("cold", ["scan", "."])
+        phase("warm", ["scan", "."])
+
+        edited = repo / info["paths"][len(info["paths"]) // 2]
+        if edited.suffix == ".py":
+            addition = "\n\ndef benchmark_added(value):\n    return value\n"
+        elif edited.suffix in (".go",):
+            addition = "\nfunc BenchmarkAdded(v int) int {\n\treturn v\n}\n"
+        elif edited.suffix == ".java":
+            addition = "\nclass BenchmarkAdded {}\n"
+        else:
+            addition = "\nint benchmark_added(int v) { return v; }\n"
+        with open(edited, "a", encoding="utf-8") as f:
+            f.write(addition)
+        phase("edit", ["scan", "."])
+
+        for md in repo.rglob(".context.md"):
+            md.unlink()
+        phase("markdown", ["scan", "."])
+        phase("clean", ["clean", "."])
+
+    info.pop("paths")
+    return {"repo": info, "phases": results}
+
+
+def summarize(runs: List[Dict]) -> Dict:
+    phases = {}
+    for name in PHASES:
+        samples = [r["phases"][name] for r in runs]
+        phases[name] = {
+            "wall_s": round(statistics.median(s["wall_s"] for s in samples), 4),
+            "wall_s_runs": [s["wall_s"] for s in samples],
+            "peak_rss_mb": max(s["peak_rss_mb"] for s in samples),
+            "llm_requests": samples[0]["llm_requests"],
+            "llm_prompt_tokens": samples[0]["llm_prompt_tokens"],
+        }
+    return phases
+
+
+def git_revision() -> str:
+    try:
+        out = subprocess.run(["git", "-C", str(REPO), "rev-parse", "--short", "HEAD"], capture_output=True, text=True)
+        return out.stdout.strip() or "unknown"
+    except OSError:
+        return "unknown"
+
+
+def compare(results: Dict, baseline_path: str):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nvs {baseline_path} ({baseline.get('revision', '?')}):")
+    for name in PHASES:
+        new, old = results["phases"].get(name), baseline.get("phases", {}).get(name)
+        if not new or not old:
+            continue
+        ratio = new["wall_s"] / old["wall_s"] if old["wall_s"] else float("nan")
+        print(f"  {name:<10}{old['wall_s']:>9.3f}s -> {new['wall_s']:>9.3f}s  ({ratio:.2f}x)"
+              f"   rss {old['peak_rss_mb']:.0f} -> {new['peak_rss_mb']:.0f} MB"
+              f"   llm {old['llm_requests']} -> {new['llm_requests']}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--files", type=int, default=500)
+    ap.add_argument("--mix", default=DEFAULT_MIX)
+    ap.add_argument("--depth", type=int, default=3)
+    ap.add_argument("--symbols", type=int, default=8, help="mean symbols per file")
+    ap.add_argument("--doc-ratio", type=float, default=0.3, help="share of symbols that need no LLM summary")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--latency", type=float, default=0.02, help="mock LLM seconds per request")
+    ap.add_argument("--provider", choices=["ollama", "openai"], default="ollama")
+    ap.add_argument("--jobs", type=int, default=None, help="SCAN_JOBS for the scans")
+    ap.add_argument("--repeat", type=int, default=1)
+    ap.add_argument("--output", default="bench_scan.json")
+    ap.add_argument("--compare", default=None, help="earlier results JSON to compare against")
+    ap.add_argument("--keep", action="store_true", help="keep the generated repository and log")
+    args = ap.parse_args()
+
+    runs = []
+    for i in range(args.repeat):
+        workdir = pathlib.Path(tempfile.mkdtemp(prefix="ccb-bench-"))
+        runs.append(run_once(args, workdir))
+        if args.keep:
+            print(f"run {i + 1}: kept {workdir}")
+        else:
+            subprocess.run(["rm", "-rf", str(workdir)])
+
+    results = {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {"latency": args.latency, "provider": args.provider, "jobs": args.jobs, "repeat": args.repeat},
+        "repo": runs[0]["repo"],
+        "phases": summarize(runs),
+    }
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    repo = results["repo"]
+    print(f"{repo['files']} files, {repo['total_symbols']} symbols, {repo['folders']} folders ({repo['mix']})")
+    print(f"{'phase':<10}{'wall s':>10}{'peak MB':>10}{'llm req':>10}{'tokens':>10}")
+    for name, p in results["phases"].items():
+        print(f"{name:<10}{p['wall_s']:>10.3f}{p['peak_rss_mb']:>10.1f}{p['llm_requests']:>10}{p['llm_prompt_tokens']:>10}")
+    print(f"Results written to {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""Local mock of the Ollama and OpenAI-compatible completion APIs for benchmarks.
+
+Usage: python benchmarks/mock_llm.py [--port 11434] [--latency 0.05] [--error-rate 0]
+
+Answers /api/generate (Ollama) and /v1/chat/completions (OpenAI) after a fixed latency.
+Batched prompts ("### id: ..." sections) get a well-formed JSON array back. GET /stats
+returns request and token counters.
+"""
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+
+BATCH_ID = re.compile(r"^### id: (.+)$", re.M)
+
+
+class MockLLM:
+    """Runs the mock server on a background thread; usable as a context manager."""
+
+    def __init__(self, port: int = 0, latency: float = 0.05, error_rate: float = 0.0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.lock = threading.Lock()
+        self.counters = {"requests": 0, "errors": 0, "prompt_tokens": 0, "completion_tokens": 0, "max_concurrency": 0}
+        self._active = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return dict(self.counters)
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _answer(self, prompt: str) -> str:
+        ids = BATCH_ID.findall(prompt)
+        if ids:
+            return json.dumps([{"id": i, "summary": f"Handles {i} for the synthetic benchmark."} for i in ids])
+        return "Handles its inputs for the synthetic benchmark."
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, payload: Dict):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._send(200, mock.stats())
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                with mock.lock:
+                    mock.counters["requests"] += 1
+                    mock._active += 1
+                    mock.counters["max_concurrency"] = max(mock.counters["max_concurrency"], mock._active)
+                try:
+                    time.sleep(mock.latency)
+                finally:
+                    with mock.lock:
+                        mock._active -= 1
+
+                if mock.error_rate and random.random() < mock.error_rate:
+                    with mock.lock:
+                        mock.counters["errors"] += 1
+                    self._send(503, {"error": "overloaded"})
+                    return
+
+                prompt = body.get("prompt") or (body.get("messages") or [{}])[0].get("content", "")
+                text = mock._answer(prompt)
+                prompt_tokens, completion_tokens = len(prompt) // 4 + 1, len(text) // 4 + 1
+                with mock.lock:
+                    mock.counters["prompt_tokens"] += prompt_tokens
+                    mock.counters["completion_tokens"] += completion_tokens
+
+                if self.path.endswith("/api/generate"):
+                    self._send(200, {"response": text, "prompt_eval_count": prompt_tokens, "eval_count": completion_tokens})
+                elif self.path.endswith("/chat/completions"):
+                    self._send(200, {"choices": [{"message": {"content": text}}],
+                                     "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens}})
+                else:
+                    self._send(404, {"error": f"unknown endpoint {self.path}"})
+
+        return Handler
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--port", type=int, default=11434)
+    ap.add_argument("--latency", type=float, default=0.05, help="seconds per request")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 503")
+    args = ap.parse_args()
+
+    mock = MockLLM(args.port, args.latency, args.error_rate)
+    print(f"Mock LLM listening on {mock.url} (latency {args.latency}s)")
+    try:
+        mock.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+"""Generates a synthetic multi-language repository for scan benchmarks.
+
+Usage: python benchmarks/synth.py OUT_DIR [--files N] [--mix py=50,ts=20,...] [--depth D]
+                                  [--symbols S] [--doc-ratio R] [--seed N]
+
+The output is deterministic for a given seed. Symbols call each other across files so that
+"Uses" lists, the symbol index and dependency sets all have realistic work to do.
+"""
+import argparse
+import os
+import pathlib
+import random
+import sys
+import time
+from typing import Dict, List
+
+DEFAULT_MIX = "py=40,ts=20,go=10,java=10,cpp=10,c=10"
+EXTENSIONS = {"py": ".py", "ts": ".ts", "go": ".go", "java": ".java", "cpp": ".cpp", "c": ".c"}
+
+
+def parse_mix(mix: str) -> Dict[str, int]:
+    weights = {}
+    for part in mix.split(","):
+        lang, _, weight = part.partition("=")
+        if lang not in EXTENSIONS:
+            raise ValueError(f"unknown language {lang!r} (expected one of {', '.join(EXTENSIONS)})")
+        weights[lang] = int(weight or 1)
+    return weights
+
+
+class Generator:
+    def __init__(self, seed: int, symbols: int, doc_ratio: float):
+        self.rng = random.Random(seed)
+        self.symbols = symbols
+        self.doc_ratio = doc_ratio
+        self.counter = 0
+        # Names already emitted per language, so calls refer to real definitions elsewhere in the repo
+        self.names: Dict[str, List[str]] = {lang: [] for lang in EXTENSIONS}
+
+    def _name(self, lang: str, prefix: str) -> str:
+        self.counter += 1
+        name = f"{prefix}{self.counter}"
+        self.names[lang].append(name)
+        return name
+
+    def _callee(self, lang: str, fallback: str) -> str:
+        pool = self.names[lang]
+        return self.rng.choice(pool) if pool else fallback
+
+    def _documented(self) -> bool:
+        return self.rng.random() < self.doc_ratio
+
+    def _count(self) -> int:
+        # Symbol density varies around the requested mean
+        return max(1, int(self.rng.gauss(self.symbols, self.symbols / 3)))
+
+    def python(self, module: str) -> str:
+        out = ["import os", f"from {module} import helpers", ""]
+        for _ in range(self._count()):
+            if self.rng.random() < 0.3:
+                cls = self._name("py", "Service")
+                out.append(f"class {cls}:")
+                if self._documented():
+                    out.append(f'    """Coordinates {cls.lower()} work."""')
+                for _ in range(self.rng.randint(1, 3)):
+                    method = self._name("py", "handle_")
+                    out += [f"    def {method}(self, value):",
+                            f"        total = {self._callee('py', 'len')}(value)",
+                            "        for item in range(total):",
+                            "            value = value + item",
+                            "        return value", ""]
+            else:
+                fn = self._name("py", "compute_")
+                out.append(f"def {fn}(a, b=None):")
+                if self._documented():
+                    out.append(f'    """Computes {fn}."""')
+                out += [f"    result = {self._callee('py', 'max')}(a, b)",
+                        "    if result is None:",
+                        "        return os.getcwd()",
+                        "    return result", ""]
+        return "\n".join(out) + "\n"
+
+    def typescript(self, module: str) -> str:
+        out = [f"import {{ helper }} from './{module}';", ""]
+        for _ in range(self._count()):
+            fn = self._name("ts", "render")
+            if self._documented():
+                out.append(f"// Renders {fn}.")
+            out += [f"export function {fn}(input: number): number {{",
+                    f"  const value = {self._callee('ts', 'helper')}(input);",
+                    "  return value * 2;",
+                    "}", ""]
+        return "\n".join(out) + "\n"
+
+    def go(self, module: str) -> str:
+        out = [f"package {module.replace('/', '_')}", "", "import (", '\t"fmt"', '\t"strings"', ")", ""]
+        for _ in range(self._count()):
+            fn = self._name("go", "Process")
+            if self._documented():
+                out.append(f"// {fn} processes input.")
+            out += [f"func {fn}(input string) string {{",
+                    f"\tvalue := {self._callee('go', 'strings.TrimSpace')}(input)",
+                    '\tfmt.Println(value)',
+                    "\treturn value",
+                    "}", ""]
+        return "\n".join(out) + "\n"
+
+    def java(self, module: str) -> str:
+        cls = self._name("java", "Component")
+        out = ["import java.util.List;", "", f"public class {cls} {{"]
+        for _ in range(self._count()):
+            method = self._name("java", "apply")
+            if self._documented():
+                out.append(f"    // Applies {method}.")
+            out += [f"    public int {method}(int input) {{",
+                    f"        return {self._callee('java', 'Math.abs')}(input) + 1;",
+                    "    }", ""]
+        out.append("}")
+        return "\n".join(out) + "\n"
+
+    def cpp(self, module: str) -> str:
+        cls = self._name("cpp", "Widget")
+        out = ["#include <vector>", f'#include "{module}.hpp"', "", f"class {cls} {{", "public:"]
+        methods = [self._name("cpp", "update") for _ in range(self._count())]
+        out += [f"    int {m}(int x);" for m in methods]
+        out += ["};", ""]
+        for m in methods:
+            if self._documented():
+                out.append(f"// Updates {m}.")
+            out += [f"int {cls}::{m}(int x) {{", f"    return {self._callee('cpp', 'abs')}(x);", "}", ""]
+        return "\n".join(out) + "\n"
+
+    def c(self, module: str) -> str:
+        out = ["#include <stdio.h>", ""]
+        for _ in range(self._count()):
+            fn = self._name("c", "c_step")
+            if self._documented():
+                out.append(f"/* Runs {fn}. */")
+            out += [f"int {fn}(int x) {{", f"    return {self._callee('c', 'abs')}(x) + 1;", "}", ""]
+        return "\n".join(out) + "\n"
+
+
+def generate(root: pathlib.Path, files: int = 500, mix: str = DEFAULT_MIX, depth: int = 3,
+             symbols: int = 8, doc_ratio: float = 0.3, seed: int = 0, files_per_dir: int = 12) -> Dict:
+    """Writes the synthetic tree under root and returns a description of what was generated."""
+    gen = Generator(seed, symbols, doc_ratio)
+    weights = parse_mix(mix)
+    langs = gen.rng.choices(list(weights), weights=list(weights.values()), k=files)
+
+    # Folders at random depths (1..depth); files are spread across them
+    folders = []
+    for i in range(max(1, files // files_per_dir)):
+        levels = gen.rng.randint(1, max(1, depth))
+        folders.append("/".join(f"pkg{i % 7}" if d == 0 else f"mod{i}_{d}" for d in range(levels)))
+
+    # Backdate everything so the first scan can trust stat data on the next one
+    past = time.time() - 3600
+    paths = []
+    for i, lang in enumerate(langs):
+        folder = gen.rng.choice(folders)
+        path = root / folder / f"file{i}{EXTENSIONS[lang]}"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        render = {"py": gen.python, "ts": gen.typescript, "go": gen.go, "java": gen.java, "cpp": gen.cpp, "c": gen.c}[lang]
+        path.write_text(render(folder.replace("/", ".") if lang == "py" else folder), encoding="utf-8")
+        os.utime(path, (past, past))
+        paths.append(path.relative_to(root).as_posix())
+
+    return {
+        "files": files, "mix": mix, "depth": depth, "symbols": symbols, "doc_ratio": doc_ratio,
+        "seed": seed, "folders": len(set(p.rsplit("/", 1)[0] for p in paths)),
+        "total_symbols": gen.counter, "paths": paths,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("out")
+    ap.add_argument("--files", type=int, default=500)
+    ap.add_argument("--mix", default=DEFAULT_MIX)
+    ap.add_argument("--depth", type=int, default=3)
+    ap.add_argument("--symbols", type=int, default=8, help="mean symbols per file")
+    ap.add_argument("--doc-ratio", type=float, default=0.3, help="share of symbols with a docstring/comment")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    info = generate(pathlib.Path(args.out), args.files, args.mix, args.depth, args.symbols, args.doc_ratio, args.seed)
+    print(f"Generated {info['files']} files, {info['total_symbols']} symbols in {info['folders']} folders under {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
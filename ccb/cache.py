@@ -0,0 +1,109 @@
+import hashlib
+import pathlib
+import sqlite3
+import time
+from typing import Dict, List, Optional, Tuple
+from .config import config
+
+
+class SummaryCache:
+    """Persistent content-addressed store of LLM summaries with size-bounded LRU eviction.
+
+    Entries are keyed on the normalized symbol code plus provider, model and prompt version,
+    so unchanged, moved or duplicated symbols reuse their summaries regardless of which file
+    they live in.
+    """
+
+    def __init__(self, path: Optional[pathlib.Path] = None, max_bytes: Optional[int] = None):
+        self.path = path or pathlib.Path(".code-index/summaries.db")
+        self.max_bytes = config.summary_cache_max_mb * 1024 * 1024 if max_bytes is None else max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._touched: Dict[str, int] = {}
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS summaries ("
+                "key TEXT PRIMARY KEY, summary TEXT NOT NULL, bytes INTEGER NOT NULL, last_used INTEGER NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS summaries_last_used ON summaries(last_used)")
+        return self._conn
+
+    @staticmethod
+    def normalize(code: str) -> str:
+        # Indentation and blank lines don't change intent, so moved/re-indented code still hits
+        return "\n".join(line.strip() for line in code.splitlines() if line.strip())
+
+    def key(self, code: str, provider: str, model: str, prompt_version: int) -> str:
+        digest = hashlib.blake2b(self.normalize(code).encode("utf-8"), digest_size=16).hexdigest()
+        return f"{digest}:{provider}:{model}:{prompt_version}"
+
+    def get(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT summary FROM summaries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._touched[key] = time.time_ns()
+        return row[0]
+
+    def put(self, key: str, summary: str):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO summaries (key, summary, bytes, last_used) VALUES (?, ?, ?, ?)",
+            (key, summary, len(key) + len(summary.encode("utf-8")), time.time_ns()),
+        )
+        self.conn.commit()
+
+    def put_many(self, items: List[Tuple[str, str]]):
+        """Stores several (key, summary) pairs in one transaction."""
+        now = time.time_ns()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO summaries (key, summary, bytes, last_used) VALUES (?, ?, ?, ?)",
+                [(key, summary, len(key) + len(summary.encode("utf-8")), now) for key, summary in items],
+            )
+
+    def stats(self) -> Dict:
+        count, total = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM summaries").fetchone()
+        return {"entries": count, "bytes": total, "max_bytes": self.max_bytes, "path": str(self.path)}
+
+    def prune(self, max_bytes: Optional[int] = None) -> int:
+        """Evicts least recently used entries until the cache fits in max_bytes. Returns the number removed."""
+        self._flush_touched()
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        total = self.conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM summaries").fetchone()[0]
+        if total <= limit:
+            return 0
+
+        removed = 0
+        doomed = []
+        for key, size in self.conn.execute("SELECT key, bytes FROM summaries ORDER BY last_used ASC"):
+            if total <= limit:
+                break
+            doomed.append((key,))
+            total -= size
+            removed += 1
+        self.conn.executemany("DELETE FROM summaries WHERE key = ?", doomed)
+        self.conn.commit()
+        return removed
+
+    def _flush_touched(self):
+        if self._touched:
+            self.conn.executemany(
+                "UPDATE summaries SET last_used = ? WHERE key = ?",
+                [(ts, key) for key, ts in self._touched.items()],
+            )
+            self.conn.commit()
+            self._touched.clear()
+
+    def close(self):
+        if self._conn is None:
+            return
+        self.prune()
+        self._conn.close()
+        self._conn = None
@@ -1,6 +1,10 @@
 import click
+import os
 import pathlib
 from .core import Scanner
+from .cache import SummaryCache
+from .registry import Registry
+from .config import config
 
 @click.group()
 def main():
@@ -9,20 +13,226 @@ def main():
 
 @main.command()
 @click.argument('path', default='.')
-def scan(path):
+@click.option('--gitignore/--no-gitignore', default=None, help="Skip files matched by .gitignore (default: RESPECT_GITIGNORE).")
+@click.option('--jobs', '-j', type=int, default=None, help="Parse changed files across N processes (0 = all cores).")
+@click.option('--since', metavar='REV', default=None, help="Only scan files changed since a git revision (plus untracked files).")
+@click.option('--stats', is_flag=True, help="Print per-phase timings, cache hit rates and LLM latency after the scan.")
+@click.option('--metrics-json', type=click.Path(dir_okay=False), default=None, help="Write the scan metrics to a JSON file.")
+@click.option('--profile', type=click.Path(dir_okay=False), default=None, help="Run the scan under cProfile and dump the stats here.")
+@click.option('--shard', metavar='I/N', default=None, help="Scan only shard I of N (1-based) into a partial registry; assemble with 'ccb merge'.")
+@click.option('--no-daemon', is_flag=True, help="Scan in this process even if 'ccb serve' is running.")
+def scan(path, gitignore, jobs, since, stats, metrics_json, profile, shard, no_daemon):
     """Scan the codebase and generate context files."""
-    scanner = Scanner()
-    scanner.scan(path)
+    if not (no_daemon or profile or shard):
+        response = forward("scan", path=os.path.abspath(path), gitignore=gitignore, jobs=jobs, since=since,
+                           stats=stats, metrics_json=metrics_json and os.path.abspath(metrics_json))
+        if response is not None:
+            click.echo("Scan complete!")
+            return
+
+    registry = None
+    if shard is not None:
+        shard = parse_shard(shard)
+        if since is not None:
+            raise click.UsageError("--shard and --since can't be combined.")
+        registry = Registry(pathlib.Path(f".code-index/shard-{shard[0]}-of-{shard[1]}.db"))
+    scanner = Scanner(registry)
+    if stats or metrics_json:
+        from .metrics import Metrics
+        scanner.metrics = Metrics()
+
+    profiler = None
+    if profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        scanner.scan(path, use_gitignore=gitignore, jobs=jobs, since=since, shard=shard)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(profile)
+            click.echo(f"Profile written to {profile} (view with: python -m pstats {profile})")
+
+    if stats:
+        scanner.metrics.print_report()
+    if metrics_json:
+        scanner.metrics.write_json(metrics_json)
+        click.echo(f"Metrics written to {metrics_json}")
     click.echo("Scan complete!")
 
+def parse_shard(value: str):
+    try:
+        index, count = (int(v) for v in value.split("/"))
+    except ValueError:
+        raise click.BadParameter(f"expected I/N, got {value!r}", param_hint="--shard")
+    if count < 1 or not 1 <= index <= count:
+        raise click.BadParameter(f"shard index must be between 1 and N, got {value!r}", param_hint="--shard")
+    return index, count
+
+@main.command()
+@click.argument('parts', nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False))
+@click.option('--root', default='.', show_default=True, help="Project root the shards were scanned from.")
+def merge(parts, root):
+    """Combine shard registries from 'ccb scan --shard' and generate context files."""
+    scanner = Scanner()
+    try:
+        scanner.merge(root, list(parts))
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.echo("Merge complete!")
+
+@main.command()
+@click.argument('path', default='.')
+@click.option('--debounce', type=int, default=50, show_default=True, help="Quiet period in ms before a burst of saves is processed.")
+@click.option('--poll', is_flag=True, help="Use stat polling instead of inotify.")
+@click.option('--gitignore/--no-gitignore', default=None, help="Skip files matched by .gitignore (default: RESPECT_GITIGNORE).")
+def watch(path, debounce, poll, gitignore):
+    """Keep context files fresh as files are saved."""
+    from .watch import WatchSession
+    WatchSession(Scanner(), pathlib.Path(path), debounce / 1000, use_polling=poll, use_gitignore=gitignore).run()
+
+def forward(op, **params):
+    """Runs a request on the 'ccb serve' daemon if one is listening; returns None otherwise."""
+    from .server import request
+
+    response = request(op, **params)
+    if response is None:
+        return None
+    if response.get("output"):
+        click.echo(response["output"], nl=False)
+    if not response["ok"]:
+        raise click.ClickException(response["error"])
+    return response
+
+@main.command()
+@click.argument('path', default='.')
+@click.option('--gitignore/--no-gitignore', default=None, help="Skip files matched by .gitignore (default: RESPECT_GITIGNORE).")
+def serve(path, gitignore):
+    """Keep the scanner warm and serve scan, rescan and query requests on a Unix socket."""
+    from .server import Daemon
+    try:
+        Daemon(pathlib.Path(path), use_gitignore=gitignore).serve_forever()
+    except RuntimeError as e:
+        raise click.ClickException(str(e))
+
+@main.command()
+def stop():
+    """Stop a running 'ccb serve' daemon."""
+    if forward("shutdown") is None:
+        raise click.ClickException("ccb serve is not running.")
+    click.echo("Stopped ccb serve.")
+
+@main.command()
+@click.argument('files', nargs=-1, required=True, type=click.Path())
+def rescan(files):
+    """Re-index individual files (or deleted paths) and refresh their folders' context files."""
+    paths = [os.path.abspath(f) for f in files]
+    response = forward("rescan", paths=paths)
+    if response is None:
+        from .server import Service
+        service = Service(pathlib.Path(".").absolute())
+        try:
+            result = service.rescan(paths)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        finally:
+            service.close()
+    else:
+        result = response["result"]
+    click.echo(f"Rescanned {result['files']} file(s), {result['written']} context file(s) updated.")
+
+@main.command()
+@click.argument('name')
+@click.option('--prefix', is_flag=True, help="List symbols whose name starts with NAME instead.")
+@click.option('--json', 'as_json', is_flag=True, help="Print the result as JSON.")
+def query(name, prefix, as_json):
+    """Show where NAME is defined, who calls it and what it calls."""
+    import json
+    from .query import location
+    from .server import run_query
+
+    response = forward("query", name=name, prefix=prefix)
+    if response is not None:
+        result = response["result"]
+    else:
+        registry = Registry()
+        if not registry.path.exists():
+            raise click.ClickException("No index found; run 'ccb scan' first.")
+        result = run_query(registry, name, prefix)
+    if as_json:
+        click.echo(json.dumps(result, indent=2))
+        return
+    if prefix:
+        for d in result:
+            click.echo(f"{d['name']:<32} {d['type']:<9} {location(d)}  {d['breadcrumb']}")
+        return
+
+    if not result["definitions"]:
+        click.echo(f"No definition of '{name}' in the index.")
+    for d in result["definitions"]:
+        click.echo(f"{d['type']} {d['breadcrumb']}  {location(d)}")
+        if d["calls"]:
+            click.echo(f"  calls: {', '.join(d['calls'])}")
+        for caller in d["callers"]:
+            click.echo(f"  called by {caller['breadcrumb']}  {location(caller)}")
+    if result["ambiguous_callers"]:
+        click.echo("Unresolved callers:" if result["definitions"] else "Callers:")
+        for caller in result["ambiguous_callers"]:
+            click.echo(f"  {caller['breadcrumb']}  {location(caller)}")
+
+@main.command()
+@click.argument('path', default='.')
+@click.option('--output', '-o', type=click.Path(file_okay=False), default=None, help="Export directory (default: EXPORT_DIR).")
+def export(path, output):
+    """Regenerate the JSON-lines index (manifest plus per-folder shards) from the registry."""
+    scanner = Scanner()
+    if not scanner.registry.path.exists():
+        raise click.ClickException("No index found; run 'ccb scan' first.")
+    count = scanner.export(path, output)
+    click.echo(f"Exported {count} folders to {output or config.export_dir}")
+
 @main.command()
 @click.argument('path', default='.')
 def clean(path):
     """Remove all .context.md files and indexing cache."""
+    if forward("ping") is not None:
+        raise click.ClickException("ccb serve is running; stop it first with 'ccb stop'.")
     scanner = Scanner()
     scanner.clean(path)
     click.echo("Cleanup complete!")
 
+@main.group()
+def cache():
+    """Inspect or trim the LLM summary cache."""
+    pass
+
+@cache.command()
+def stats():
+    """Show summary cache size and entry count."""
+    summary_cache = SummaryCache()
+    info = summary_cache.stats()
+    click.echo(f"Cache: {info['path']}")
+    click.echo(f"Entries: {info['entries']}")
+    click.echo(f"Size: {info['bytes'] / 1024 / 1024:.2f} MB (limit {info['max_bytes'] / 1024 / 1024:.0f} MB)")
+
+@cache.command()
+@click.option('--max-mb', type=float, default=None, help="Evict least recently used entries down to this size.")
+@click.option('--all', 'prune_all', is_flag=True, help="Remove every cached summary.")
+def prune(max_mb, prune_all):
+    """Evict least recently used summaries until the cache fits its size limit."""
+    summary_cache = SummaryCache()
+    if prune_all:
+        max_bytes = 0
+    elif max_mb is not None:
+        max_bytes = int(max_mb * 1024 * 1024)
+    else:
+        max_bytes = None
+    removed = summary_cache.prune(max_bytes)
+    click.echo(f"Removed {removed} cached summaries.")
+
 @main.command()
 def init():
     """Interactively configure LLM settings and create .ccbenv."""
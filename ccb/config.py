@@ -14,12 +14,34 @@ class LLMConfig:
     model: str = os.getenv("LLM_MODEL", "llama3")
     base_url: Optional[str] = os.getenv("LLM_BASE_URL")
     api_key: Optional[str] = os.getenv("LLM_API_KEY")
+    timeout: float = float(os.getenv("LLM_TIMEOUT", "30"))
+    concurrency: int = int(os.getenv("LLM_CONCURRENCY", "8"))
+    rate_limit: float = float(os.getenv("LLM_RATE_LIMIT", "0"))  # requests per second, 0 = unlimited
+    max_retries: int = int(os.getenv("LLM_MAX_RETRIES", "4"))
+    batch_size: int = int(os.getenv("LLM_BATCH_SIZE", "8"))  # symbols per request, 1 disables batching
+    batch_max_tokens: int = int(os.getenv("LLM_BATCH_MAX_TOKENS", "3000"))  # estimated code tokens per batch
+    # Longer symbols are sent as a skeleton (signature, comments, member one-liners, truncated body); 0 = full code
+    prompt_max_tokens: int = int(os.getenv("LLM_PROMPT_MAX_TOKENS", "800"))
+    # Per-scan summarization budget, 0 = unlimited; symbols over budget stay pending for the next scan
+    max_requests: int = int(os.getenv("LLM_MAX_REQUESTS", "0"))
+    max_tokens: int = int(os.getenv("LLM_MAX_TOKENS", "0"))  # estimated code tokens
+    time_budget: float = float(os.getenv("LLM_TIME_BUDGET", "0"))  # seconds
 
 @dataclass
 class AppConfig:
     llm: LLMConfig = field(default_factory=LLMConfig)
-    include: List[str] = field(default_factory=lambda: os.getenv("INCLUDE_PATTERNS", "**/*.ts,**/*.py,**/*.go,**/*.java,**/*.c,**/*.h,**/*.cpp,**/*.hpp,**/*.cu,**/*.cuh").split(","))
+    include: List[str] = field(default_factory=lambda: os.getenv("INCLUDE_PATTERNS", "**/*.py,**/*.go,**/*.java,**/*.ts,**/*.js,**/*.cpp,**/*.cc,**/*.cxx,**/*.c,**/*.h,**/*.hpp,**/*.cu,**/*.cuh").split(","))
     exclude: List[str] = field(default_factory=lambda: os.getenv("EXCLUDE_PATTERNS", "**/node_modules/**,**/dist/**,**/build/**,**/.git/**").split(","))
     output_file_name: str = os.getenv("OUTPUT_FILE_NAME", ".context.md")
+    summary_cache_max_mb: int = int(os.getenv("SUMMARY_CACHE_MAX_MB", "64"))
+    jobs: int = int(os.getenv("SCAN_JOBS", "1"))
+    parser_engine: str = os.getenv("PARSER_ENGINE", "query")  # "query" or the recursive "visitor"
+    respect_gitignore: bool = os.getenv("RESPECT_GITIGNORE", "false").lower() in ("1", "true", "yes")
+    max_file_kb: int = int(os.getenv("MAX_FILE_KB", "1024"))  # larger files are limited, 0 = no limit
+    large_file_mode: str = os.getenv("LARGE_FILE_MODE", "signatures")  # generated/oversized files: "signatures" or "skip"
+    detect_generated: bool = os.getenv("DETECT_GENERATED", "true").lower() in ("1", "true", "yes")
+    export_index: bool = os.getenv("EXPORT_INDEX", "true").lower() in ("1", "true", "yes")  # JSON-lines index next to the markdown
+    export_dir: str = os.getenv("EXPORT_DIR", ".code-index/export")
+    socket_path: str = os.getenv("CCB_SOCKET", ".code-index/ccb.sock")  # where `ccb serve` listens
 
 config = AppConfig()
@@ -1,130 +1,470 @@
 import os
+import contextlib
 import hashlib
-import json
+import io
+import itertools
 import pathlib
-import re
-from typing import Dict, List, Set
+import posixpath
+import tempfile
+import time
+from typing import Container, Dict, Iterator, List, Optional, Set, Tuple
 from .config import config
-from .parsers.universal import UniversalParser
-from .llm.ollama import OllamaProvider
-from .llm.openai import OpenAIProvider
+from .cache import SummaryCache
+from .registry import Registry
+from .parallel import ParseJob, ParsePool, ParseResult
+from .ingest import SIGNATURES, SKIP, decode_check, read_source, release, triage
+from .parsers import supports
+from .parsers.base import load_code
+from .llm.prompt import PROMPT_VERSION
+from .locking import write_lock
+from .metrics import Metrics
+from .scheduler import SummaryScheduler
+
+RACY_WINDOW_NS = 2_000_000_000
+# Longest "Uses" list rendered per symbol
+MAX_USES = 15
+# Pass 1 parses changed files in batches of this many files or bytes, whichever comes first
+PARSE_BATCH_FILES = 256
+PARSE_BATCH_BYTES = 16 * 1024 * 1024
+# Walked paths are recorded in the registry's sweep table in chunks of this size
+SEEN_FLUSH = 2048
+FINGERPRINT_PREFIX = "<!-- ccb:fingerprint "
+
+# mkstemp creates 0600 files; generated docs should get the usual umask-derived mode
+UMASK = os.umask(0)
+os.umask(UMASK)
+
+
+def atomic_write(path: pathlib.Path, text: str):
+    """Writes via a temp file in the same folder plus rename, so readers never see a partial file."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.chmod(tmp, 0o666 & ~UMASK)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def shard_of(rel_path: str, count: int) -> int:
+    """Deterministic 1-based shard of a path; stable across machines and Python processes."""
+    digest = hashlib.blake2b(rel_path.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % count + 1
+
 
 class Scanner:
-    def __init__(self):
-        self.parsers = [
-            UniversalParser('python', ['.py']),
-            UniversalParser('go', ['.go']),
-            UniversalParser('java', ['.java']),
-            UniversalParser('typescript', ['.ts', '.tsx', '.js', '.jsx']),
-            UniversalParser('cpp', ['.cpp', '.hpp', '.cc', '.cxx', '.cu', '.cuh']),
-            UniversalParser('c', ['.c', '.h']),
-        ]
-        self.registry_path = pathlib.Path(".code-index/registry.json")
-        self.registry = self._load_registry()
-        
-        if config.llm.provider == "openai" or config.llm.provider in ["lmstudio", "llamacpp"]:
-            self.llm = OpenAIProvider()
-        else:
-            self.llm = OllamaProvider()
+    def __init__(self, registry: Optional[Registry] = None):
+        self.registry = registry or Registry()
+        self.summary_cache = SummaryCache()
+        self.metrics = Metrics(enabled=False)
+        self._llm = None
+        self._exporter = None
 
-    def _load_registry(self):
-        if self.registry_path.exists():
-            with open(self.registry_path, "r") as f:
-                try:
-                    return json.load(f)
-                except:
-                    return {"files": {}}
-        return {"files": {}}
+    @property
+    def llm(self):
+        # Built on first use so commands that never summarize don't import httpx
+        if self._llm is None:
+            if config.llm.provider == "openai" or config.llm.provider in ["lmstudio", "llamacpp"]:
+                from .llm.openai import OpenAIProvider
+                self._llm = OpenAIProvider()
+            else:
+                from .llm.ollama import OllamaProvider
+                self._llm = OllamaProvider()
+        return self._llm
 
-    def _save_registry(self):
-        self.registry_path.parent.mkdir(exist_ok=True)
-        with open(self.registry_path, "w") as f:
-            json.dump(self.registry, f, indent=2)
+    @property
+    def exporter(self):
+        """The JSON-lines index written alongside the context files, or None when EXPORT_INDEX is off."""
+        if self._exporter is None and config.export_index:
+            from .export import IndexExporter
+            self._exporter = IndexExporter(pathlib.Path(config.export_dir), self.registry)
+        return self._exporter
 
-    def get_hash(self, content: str):
-        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+    def save_export(self, root: pathlib.Path):
+        if self.exporter is not None:
+            self.exporter.save(root.resolve().name)
 
-    def scan(self, root_dir: str):
-        root = pathlib.Path(root_dir)
-        files_to_scan = []
-        extensions = [".py", ".go", ".java", ".ts", ".js", ".cpp", ".cc", ".cxx", ".c", ".h", ".hpp", ".cu", ".cuh"]
-        
-        for ext in extensions:
-            files_to_scan.extend(root.rglob(f"*{ext}"))
+    def _seed_legacy_summaries(self):
+        # Summaries from a migrated registry.json, keyed like any other, so re-parsed symbols find them
+        legacy = self.registry.take_legacy_summaries()
+        if legacy:
+            self.summary_cache.put_many([
+                (self.summary_cache.key(code, self.llm.name, config.llm.model, PROMPT_VERSION), summary)
+                for code, summary in legacy])
+            print(f"Imported {len(legacy)} summaries from the legacy registry.")
+
+    def get_hash(self, content: bytes):
+        return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+    def _stat_fields(self, st: os.stat_result) -> Dict:
+        # A file modified within the last couple of seconds may still change inside the
+        # same mtime tick, so don't trust its stat data; the next scan will hash it.
+        if time.time_ns() - st.st_mtime_ns < RACY_WINDOW_NS:
+            return {"mtime_ns": None, "size": st.st_size, "inode": st.st_ino}
+        return {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "inode": st.st_ino}
+
+    def _stat_matches(self, cached: Dict, st: os.stat_result) -> bool:
+        return (
+            cached.get("mtime_ns") is not None
+            and cached.get("mtime_ns") == st.st_mtime_ns
+            and cached.get("size") == st.st_size
+            and cached.get("inode") == st.st_ino
+        )
+
+    def iter_files(self, root: pathlib.Path, use_gitignore: Optional[bool] = None):
+        """Lazily yields candidate source files from a single pruned walk, grouped by folder."""
+        from .walker import Walker  # pathspec is only needed when walking
+
+        if use_gitignore is None:
+            use_gitignore = config.respect_gitignore
+        walker = Walker(config.include, config.exclude, use_gitignore)
+        for _, files in walker.walk(root):
+            yield from files
+
+    def git_files(self, root: pathlib.Path, rev: str, use_gitignore: Optional[bool] = None):
+        """Candidate files from git instead of a walk: everything changed since rev, plus untracked files.
 
-        contexts_by_folder = {}
-        folder_dependencies: Dict[str, Set[str]] = {}
-        all_public_symbols: Set[str] = set()
+        Renamed files keep their registry rows (and so their symbols and summaries), deleted files are
+        dropped. Returns the files to scan and the folders whose context files need re-rendering.
+        """
+        from .gitdiff import git_changes
+        from .walker import Walker
 
-        # Pass 1: Parse and Registry Update
-        for file_path in files_to_scan:
-            rel_path = str(file_path.relative_to(root))
-            if any(part.startswith('.') or part in ['node_modules', 'dist', 'build'] for part in file_path.parts):
+        if use_gitignore is None:
+            use_gitignore = config.respect_gitignore
+        walker = Walker(config.include, config.exclude, use_gitignore)
+        changes = git_changes(root, rev)
+
+        dirty: Set[str] = set()
+        for old, new in changes.renamed:
+            if not walker.accepts(root, new):
+                changes.deleted.add(old)
+            elif self.registry.rename(old, new):
+                dirty.add(posixpath.dirname(old) or ".")
+        for rel_path in sorted(changes.deleted):
+            if self.registry.stat(rel_path) is not None:
+                self.registry.delete(rel_path)
+                dirty.add(posixpath.dirname(rel_path) or ".")
+
+        files = [root / rel_path for rel_path in sorted(changes.changed)
+                 if walker.accepts(root, rel_path) and (root / rel_path).is_file()]
+        return files, dirty
+
+    def scan(self, root_dir: str, use_gitignore: Optional[bool] = None, jobs: Optional[int] = None,
+             since: Optional[str] = None, shard: Optional[Tuple[int, int]] = None):
+        """Streams the tree in two bounded-memory passes.
+
+        Pass 1 walks and parses files in small batches and commits each one to the registry; nothing
+        accumulates across batches. Symbols the summary cache can't answer are committed as pending, and
+        the SummaryScheduler then works through them by rank within the LLM budget. Pass 2 renders, one folder
+        at a time from the registry, only the folders that changed: new, edited, deleted or newly summarized
+        files, calls into definitions that changed, or output that is missing. A no-op scan renders nothing.
+
+        With shard=(i, n) only the files whose path hashes to shard i (1-based) of n are scanned and pass 2
+        is skipped; `merge` assembles the shard registries and renders afterwards.
+
+        Holds the project write lock throughout, so concurrent scans (or a daemon) take turns. Shard scans
+        only write their own registry and run unlocked.
+        """
+        with write_lock if shard is None else contextlib.nullcontext():
+            self._scan(pathlib.Path(root_dir), use_gitignore, jobs, since, shard)
+
+    def _scan(self, root: pathlib.Path, use_gitignore: Optional[bool], jobs: Optional[int],
+              since: Optional[str], shard: Optional[Tuple[int, int]]):
+        m = self.metrics
+        # A long-lived Scanner (watch, serve) runs many scans: counters are per scan, and the export
+        # manifest is re-read in case another process rewrote it in between
+        self.summary_cache.hits = self.summary_cache.misses = 0
+        self._exporter = None
+        self._seed_legacy_summaries()
+        if shard is None:
+            # Pass 2 also re-renders folders calling into definitions that were added, moved or removed
+            self.registry.track_definitions()
+
+        with m.phase("walk"):
+            if since is not None:
+                files, dirty = self.git_files(root, since, use_gitignore)
+            else:
+                files, dirty = self.iter_files(root, use_gitignore), set()
+                # Rows of files the walk no longer finds are swept after pass 1
+                self.registry.begin_sweep()
+
+        # Folders in walk order; far fewer than files. Pass 2 renders the dirty ones and any whose output is missing
+        folders: List[str] = []
+        # Changed files, whose symbols were already looked up in the summary cache
+        parsed: Set[str] = set()
+        seen: List[str] = []
+        batch: List[Tuple[str, Dict]] = []
+        batch_jobs = []
+        batch_bytes = 0
+
+        pool = ParsePool(config.jobs if jobs is None else jobs)
+        if m.enabled:
+            self.llm.on_usage = m.llm_usage
+
+        # Pass 1: Find changed files, parse them in batches and commit them; unchanged ones stay as they are
+        for file_path in m.timed("walk", files):
+            rel_path = file_path.relative_to(root).as_posix()
+            if shard is not None and shard_of(rel_path, shard[1]) != shard[0]:
                 continue
+            folder = file_path.parent.relative_to(root).as_posix()
+            if not folders or folders[-1] != folder:
+                folders.append(folder)
 
             try:
-                with open(file_path, "r", encoding="utf-8") as f:
-                    content = f.read()
-            except:
+                with m.phase("stat"):
+                    st = file_path.stat()
+            except OSError:
                 continue
-            
-            file_hash = self.get_hash(content)
-            cached = self.registry["files"].get(rel_path)
-
-            folder = str(file_path.parent.relative_to(root))
-            if folder not in folder_dependencies: folder_dependencies[folder] = set()
-            self._extract_dependencies(content, folder_dependencies[folder])
+            with m.phase("registry"):
+                cached = self.registry.stat(rel_path)
 
-            if cached and cached["hash"] == file_hash:
-                symbols = cached["symbols"]
-            else:
-                parser = next((p for p in self.parsers if p.supports(file_path.suffix)), None)
-                if not parser: continue
-                
-                print(f"Scanning {rel_path}...")
+            # Fast path: unchanged stat data means unchanged content, no read needed
+            if cached and self._stat_matches(cached, st):
+                m.count("stat_unchanged")
+                seen.append(rel_path)
+            elif supports(file_path.suffix):
+                # One read (or mapping) per file; hashing, detection and parsing all use this buffer
                 try:
-                    raw_symbols = parser.parse(content, rel_path)
-                    symbols = [s.to_dict() for s in raw_symbols]
-
-                    for s in symbols:
-                        if not s.get("summary") and s.get("is_public"):
-                            summary = self.llm.summarize(rel_path, s["code"])
-                            if summary:
-                                print(f"  Summarized {s['name']} via LLM.")
-                                s["summary"] = summary
-                    
-                    self.registry["files"][rel_path] = {"hash": file_hash, "symbols": symbols}
-                except Exception as e:
-                    print(f"Error parsing {rel_path}: {e}")
+                    with m.phase("read"):
+                        buf = read_source(file_path, st.st_size)
+                except (OSError, ValueError):
                     continue
+                try:
+                    m.count("bytes_read", len(buf))
+                    with m.phase("hash"):
+                        file_hash = self.get_hash(buf)
+                    if cached and cached["hash"] == file_hash:
+                        # Touched but not modified: refresh the stat fingerprint only
+                        m.count("hash_unchanged")
+                        seen.append(rel_path)
+                        cached.update(self._stat_fields(st))
+                        with m.phase("registry"):
+                            self.registry.update_stat(rel_path, cached)
+                    else:
+                        record = {"hash": file_hash, **self._stat_fields(st)}
+                        mode, note = triage(buf, len(buf))
+                        if mode == SKIP:
+                            # Recorded without symbols, so the stat fast path skips it next time too
+                            m.count("skipped_files")
+                            print(f"Skipping {rel_path}: {note}.")
+                            seen.append(rel_path)
+                            dirty.add(folder)
+                            with m.phase("registry"):
+                                self.registry.put(rel_path, dict(record, dependencies=[], symbols=[], note=note))
+                        else:
+                            source = buf if isinstance(buf, bytes) else buf[:]
+                            try:
+                                decode_check(source)
+                            except UnicodeDecodeError:
+                                continue
+                            if note:
+                                m.count("signature_only_files")
+                                record["note"] = note
+                            seen.append(rel_path)
+                            parsed.add(rel_path)
+                            dirty.add(folder)
+                            batch.append((rel_path, record))
+                            batch_jobs.append((file_path.suffix, source, rel_path, mode == SIGNATURES))
+                            batch_bytes += len(source)
+                finally:
+                    release(buf)
+
+            if len(seen) >= SEEN_FLUSH and since is None:
+                self.registry.mark_seen(seen)
+                seen = []
+            if len(batch) >= PARSE_BATCH_FILES or batch_bytes >= PARSE_BATCH_BYTES:
+                self._parse_batch(batch, batch_jobs, pool.map(batch_jobs))
+                batch, batch_jobs, batch_bytes = [], [], 0
 
-            # Accumulate all public symbol names for Pass 2 filtering
-            for s in symbols:
-                if s.get("is_public"):
-                    all_public_symbols.add(s["name"])
+        self._parse_batch(batch, batch_jobs, pool.map(batch_jobs))
+        pool.close()
 
-            if folder not in contexts_by_folder: contexts_by_folder[folder] = []
-            contexts_by_folder[folder].append({"path": rel_path, "symbols": symbols})
+        # Summaries for pending symbols, most valuable first, within the LLM budget
+        dirty |= SummaryScheduler(self).run(root, parsed)
+        if self.summary_cache.hits:
+            print(f"Reused {self.summary_cache.hits} cached summaries.")
+        m.count("summary_cache_hits", self.summary_cache.hits)
+        m.count("summary_cache_misses", self.summary_cache.misses)
+        with m.phase("registry"):
+            self.summary_cache.close()
+            if since is None:
+                self.registry.mark_seen(seen)
+                for rel_path in self.registry.sweep():
+                    dirty.add(posixpath.dirname(rel_path) or ".")
 
-        # Pass 2: Filter 'calls' to only include internal public symbols
-        for folder_contexts in contexts_by_folder.values():
-            for ctx in folder_contexts:
-                for s in ctx["symbols"]:
-                    if s.get("calls"):
-                        # Keep only calls that exist in our public registry
-                        s["calls"] = sorted(list(set([c for d, c in zip(range(15), s["calls"]) if c in all_public_symbols and c != s["name"]])))
+        if shard is not None:
+            print(f"Shard {shard[0]}/{shard[1]}: registry written to {self.registry.path}")
+            return
 
-        self._save_registry()
-        self._write_markdown(root, contexts_by_folder, folder_dependencies)
+        # Pass 2: Render the dirty folders one at a time from the registry (root file last)
+        with m.phase("registry"):
+            dirty |= self.registry.dependent_folders()
+        with m.phase("markdown"):
+            for folder in dict.fromkeys(folders):
+                if folder not in dirty and not self._rendered(root, folder):
+                    dirty.add(folder)
+            if not dirty:
+                print("Context files: all up to date.")
+                return
+            written = skipped = 0
+            for folder in sorted(dirty - {"."}) + ["."]:
+                if self.refresh_folder(root, folder):
+                    written += 1
+                else:
+                    skipped += 1
+            self.save_export(root)
+        print(f"Context files: {written} rewritten, {skipped} unchanged.")
+
+    def _rendered(self, root: pathlib.Path, folder_rel: str) -> bool:
+        """Whether a folder's context file (and export shard) exist, e.g. not deleted by hand since the last scan."""
+        if self.exporter is not None and folder_rel not in self.exporter.folders:
+            return False
+        return (root / folder_rel / config.output_file_name).exists()
+
+    def merge(self, root_dir: str, parts: List[str]):
+        """Replaces the registry with the union of shard registries, then renders every folder.
+
+        Files no shard reported are dropped (the shards together cover the whole tree).
+        """
+        with write_lock:
+            self._merge(pathlib.Path(root_dir), parts)
+
+    def _merge(self, root: pathlib.Path, parts: List[str]):
+        self.registry.begin_sweep()
+        for part in parts:
+            part_path = pathlib.Path(part)
+            if not part_path.exists():
+                raise ValueError(f"shard registry not found: {part}")
+            shard_registry = Registry(part_path)
+            entries = shard_registry.entries()
+            count = 0
+            while True:
+                chunk = list(itertools.islice(entries, SEEN_FLUSH))
+                if not chunk:
+                    break
+                self.registry.put_many(chunk)
+                self.registry.mark_seen([rel_path for rel_path, _ in chunk])
+                count += len(chunk)
+            shard_registry.close()
+            print(f"Merged {count} files from {part}")
+
+        dirty = {posixpath.dirname(rel_path) or "." for rel_path in self.registry.sweep()}
+        folders = {posixpath.dirname(rel_path) or "." for rel_path in self.registry.paths()}
+        written = skipped = 0
+        for folder in sorted((folders | dirty) - {"."}) + ["."]:
+            if self.refresh_folder(root, folder):
+                written += 1
+            else:
+                skipped += 1
+        self.save_export(root)
+        print(f"Context files: {written} rewritten, {skipped} unchanged.")
+
+    def export(self, root_dir: str, directory: Optional[str] = None) -> int:
+        """Rewrites the whole JSON-lines index from the registry; returns the number of folders exported."""
+        from .export import IndexExporter
+
+        root = pathlib.Path(root_dir)
+        exporter = IndexExporter(pathlib.Path(directory or config.export_dir), self.registry)
+        with write_lock:
+            exporter.reset()
+            folders = {posixpath.dirname(rel_path) or "." for rel_path in self.registry.paths()}
+            for folder in sorted(folders):
+                contexts, _ = self._folder_contexts(folder)
+                exporter.write_folder(folder, contexts)
+            exporter.save(root.resolve().name)
+        # The scanner's own exporter may have cached the manifest that was just replaced
+        self._exporter = None
+        return len(folders)
+
+    def _parse_batch(self, batch: List[Tuple[str, Dict]], jobs: List[ParseJob], results: Iterator[ParseResult]):
+        """Stores one batch of parse results; symbols the summary cache doesn't know are left pending."""
+        m = self.metrics
+        for (rel_path, record), job in zip(batch, jobs):
+            print(f"Scanning {rel_path}...")
+            with m.phase("parse_wait"):
+                symbols, dependencies, error, (parse_s, extract_s) = next(results)
+            m.count("parsed")
+            m.parsed(rel_path, posixpath.splitext(rel_path)[1], record["size"], parse_s, extract_s)
+            if error is not None:
+                print(f"Error parsing {rel_path}: {error}")
+                # Don't keep rendering symbols from an older version of a file that no longer parses
+                self.registry.delete(rel_path)
+                continue
+            record["dependencies"] = dependencies
+            m.count("symbols", len(symbols))
+
+            # Signature-only files (generated or oversized) never go to the LLM
+            wanted = [] if record.get("note") else [s for s in symbols if not s.get("summary") and s.get("is_public")]
+            if wanted:
+                with m.phase("summary_cache"):
+                    # The parse job still holds the file's bytes; cache misses are registered as pending
+                    for s in wanted:
+                        key = self.summary_cache.key(load_code(job[1], s), self.llm.name, config.llm.model, PROMPT_VERSION)
+                        summary = self.summary_cache.get(key)
+                        if summary:
+                            s["summary"] = summary
+
+            record["symbols"] = symbols
+            with m.phase("registry"):
+                self.registry.put(rel_path, record)
+
+    def _filter_calls(self, symbols: List[Dict], known: Container[str]) -> List[Dict]:
+        """Copies of symbols whose 'calls' keep only names defined as public symbols somewhere in the project."""
+        filtered = []
+        for s in symbols:
+            if s.get("calls"):
+                # Filter before capping, so unknown names don't crowd out resolved ones
+                s = dict(s, calls=sorted({c for c in s["calls"] if c in known and c != s["name"]})[:MAX_USES])
+            filtered.append(s)
+        return filtered
+
+    def _folder_contexts(self, folder_rel: str) -> Tuple[List[Dict], Set[str]]:
+        """Per-file contexts of one folder with calls filtered against the symbol index, plus the folder's dependencies."""
+        known = self.registry.known_callees(folder_rel)
+        contexts = []
+        deps: Set[str] = set()
+        for rel_path, entry in self.registry.folder_entries(folder_rel):
+            deps.update(entry.get("dependencies", []))
+            contexts.append({"path": rel_path, "symbols": self._filter_calls(entry["symbols"], known),
+                             "note": entry.get("note"), "dependencies": entry.get("dependencies", [])})
+        return contexts, deps
+
+    def refresh_folder(self, root: pathlib.Path, folder_rel: str) -> bool:
+        """Re-renders one folder's context file from the registry alone (no reads or parses).
+
+        Calls are filtered against the symbol index, so only this folder's rows are ever in memory.
+        """
+        contexts, deps = self._folder_contexts(folder_rel)
+        if self.exporter is not None:
+            if contexts:
+                self.exporter.write_folder(folder_rel, contexts)
+            else:
+                self.exporter.remove_folder(folder_rel)
+
+        if not contexts and folder_rel != ".":
+            md_path = root / folder_rel / config.output_file_name
+            if md_path.exists():
+                md_path.unlink()
+                print(f"Removed {md_path}")
+                return True
+            return False
+        return self._write_folder(root, folder_rel, contexts, deps)
 
     def clean(self, root_dir: str):
         root = pathlib.Path(root_dir)
         print(f"Cleaning up context files in {root}...")
         
-        # 1. Remove registry
-        if self.registry_path.exists():
-            self.registry_path.unlink()
-            print(f"Removed {self.registry_path}")
+        # 1. Remove registry and exported index
+        if self.registry.remove():
+            print(f"Removed {self.registry.path}")
+        from .export import IndexExporter
+
+        exporter = IndexExporter(pathlib.Path(config.export_dir), self.registry)
+        if exporter.remove():
+            print(f"Removed the exported index in {exporter.directory}")
         
         # 2. Remove all .context.md files
         count = 0
@@ -134,45 +474,47 @@ class Scanner:
         
         print(f"Removed {count} {config.output_file_name} files.")
 
-    def _extract_dependencies(self, content: str, deps: Set[str]):
-        patterns = [
-            r'^import\s+([\w\.]+)', 
-            r'^from\s+([\w\.]+)\s+import', 
-            r'^#include\s*[<"]([\w\./]+)[>"]', 
-            r'^import\s+.*from\s+[\'"]([\w\./@\-]+)[\'"]', 
-        ]
-        for p in patterns:
-            for match in re.finditer(p, content, re.MULTILINE):
-                deps.add(match.group(1))
-
-    def _write_markdown(self, root: pathlib.Path, contexts_by_folder: Dict, folder_deps: Dict[str, Set[str]]):
-        for folder_rel, contexts in contexts_by_folder.items():
-            if folder_rel == ".": continue
-            
-            md_path = root / folder_rel / config.output_file_name
-            with open(md_path, "w") as f:
-                f.write(f"# Directory: {folder_rel}\n\n")
-                
-                deps = sorted(list(folder_deps.get(folder_rel, set())))[:15]
-                if deps:
-                    f.write("## 📦 Dependencies\n")
-                    f.write(", ".join([f"`{d}`" for d in deps]) + "\n\n")
-
-                self._write_file_contexts(f, contexts)
-            print(f"Updated {md_path}")
-
-        root_md = root / config.output_file_name
-        with open(root_md, "w") as f:
-            f.write(f"# Project Root: {root.name}\n\n")
+    def _write_folder(self, root: pathlib.Path, folder_rel: str, contexts: List[Dict], deps: Set[str]) -> bool:
+        """Renders one folder's context file (the project root file for "."); returns whether it was rewritten."""
+        f = io.StringIO()
+        if folder_rel == ".":
+            md_path = root / config.output_file_name
+            f.write(f"# Project Root: {root.resolve().name}\n\n")
             f.write("## 🤖 Agent Instructions\n")
             f.write("This codebase uses a **Distributed Context System**.\n")
             f.write(f"1. Every folder contains a `{config.output_file_name}` summarizing its public API.\n")
             f.write(f"2. You MUST update these files when you change public symbols.\n\n")
-            
-            if "." in contexts_by_folder:
+
+            if contexts:
                 f.write("## Root Level Files\n")
-                self._write_file_contexts(f, contexts_by_folder["."])
-        print(f"Updated Root Context: {root_md}")
+                self._write_file_contexts(f, contexts)
+        else:
+            md_path = root / folder_rel / config.output_file_name
+            f.write(f"# Directory: {folder_rel}\n\n")
+
+            deps = sorted(list(deps))[:15]
+            if deps:
+                f.write("## 📦 Dependencies\n")
+                f.write(", ".join([f"`{d}`" for d in deps]) + "\n\n")
+
+            self._write_file_contexts(f, contexts)
+
+        if not self._write_if_changed(md_path, f.getvalue()):
+            return False
+        print(f"Updated Root Context: {md_path}" if folder_rel == "." else f"Updated {md_path}")
+        return True
+
+    def _write_if_changed(self, md_path: pathlib.Path, body: str) -> bool:
+        """Writes body with a fingerprint header unless the file on disk already carries the same fingerprint."""
+        header = f"{FINGERPRINT_PREFIX}{self.get_hash(body.encode('utf-8'))} -->\n"
+        try:
+            with open(md_path, "r", encoding="utf-8") as f:
+                if f.readline() == header:
+                    return False
+        except (OSError, UnicodeDecodeError):
+            pass
+        atomic_write(md_path, header + body)
+        return True
 
     def _write_file_contexts(self, f, contexts):
         all_filenames = [os.path.basename(ctx['path']) for ctx in contexts]
@@ -195,7 +537,9 @@ class Scanner:
             if related:
                 f.write(f"- **Related**: {', '.join([f'[{r}]({r})' for r in related])}\n")
             
-            if not ctx['symbols']:
+            if ctx.get('note'):
+                f.write(f"*{ctx['note']}.*\n")
+            elif not ctx['symbols']:
                 f.write("*No public symbols found.*\n")
             for s in ctx["symbols"]:
                 f.write(f"### `{s['signature']}`\n")
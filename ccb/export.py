@@ -0,0 +1,165 @@
+import hashlib
+import json
+import pathlib
+import posixpath
+from typing import Dict, List, Optional
+from .core import atomic_write
+from .query import resolve
+from .registry import Registry
+
+# Bumped on incompatible changes to the manifest or shard records; readers should check it
+EXPORT_VERSION = 1
+MANIFEST = "manifest.json"
+
+
+class IndexExporter:
+    """Machine-readable twin of the context files: a root manifest plus one JSON-lines shard per folder.
+
+    Each shard line describes one file (path, note, dependencies, symbols with signatures, breadcrumbs,
+    bases, fields, summaries and calls resolved to their definitions where unambiguous). The manifest
+    lists every folder's shard with its content hash, size and the byte offset of each file's line, so
+    a reader can load one folder, or seek to one file, without reading anything else.
+
+    Shards are rewritten only when their content changes; the manifest is written by save().
+    """
+
+    def __init__(self, directory: pathlib.Path, registry: Registry):
+        self.directory = directory
+        self.registry = registry
+        self._folders: Optional[Dict[str, Dict]] = None
+        self._changed = False
+
+    @property
+    def folders(self) -> Dict[str, Dict]:
+        if self._folders is None:
+            self._folders = self._load()
+        return self._folders
+
+    def _read_manifest(self) -> Dict:
+        try:
+            with open(self.directory / MANIFEST, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return manifest if isinstance(manifest, dict) else {}
+
+    def _load(self) -> Dict[str, Dict]:
+        manifest = self._read_manifest()
+        if not manifest:
+            return {}
+        # A manifest in another format version is rebuilt shard by shard
+        if manifest.get("version") != EXPORT_VERSION:
+            self._changed = True
+            return {}
+        return manifest.get("folders", {})
+
+    def shard_path(self, folder_rel: str) -> str:
+        """Shard file of a folder, relative to the export directory (flat, so deep trees stay shallow)."""
+        return f"shards/{hashlib.blake2b(folder_rel.encode('utf-8'), digest_size=8).hexdigest()}.jsonl"
+
+    def write_folder(self, folder_rel: str, contexts: List[Dict]) -> bool:
+        """Writes one folder's shard from the contexts rendered for its context file; returns whether it changed."""
+        definitions = self.registry.callee_definitions(folder_rel)
+        lines = []
+        offsets = {}
+        offset = 0
+        symbol_count = 0
+        for ctx in contexts:
+            record = {"path": ctx["path"]}
+            if ctx.get("note"):
+                record["note"] = ctx["note"]
+            if ctx.get("dependencies"):
+                record["dependencies"] = ctx["dependencies"]
+            record["symbols"] = [self._symbol(s, ctx["path"], definitions) for s in ctx["symbols"]]
+            symbol_count += len(record["symbols"])
+            line = json.dumps(record, separators=(",", ":"), ensure_ascii=False) + "\n"
+            offsets[posixpath.basename(ctx["path"])] = offset
+            offset += len(line.encode("utf-8"))
+            lines.append(line)
+
+        text = "".join(lines)
+        entry = {
+            "shard": self.shard_path(folder_rel),
+            "hash": hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest(),
+            "bytes": offset,
+            "files": len(contexts),
+            "symbols": symbol_count,
+            "offsets": offsets,
+        }
+        path = self.directory / entry["shard"]
+        if self.folders.get(folder_rel) == entry and path.exists():
+            return False
+        path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(path, text)
+        self.folders[folder_rel] = entry
+        self._changed = True
+        return True
+
+    def _symbol(self, s: Dict, rel_path: str, definitions: Dict[str, List[Dict]]) -> Dict:
+        out = {
+            "name": s["name"],
+            "type": s["type"],
+            "signature": s["signature"],
+            "breadcrumb": s["breadcrumb"],
+            "lines": [s["line_start"], s["line_end"]],
+        }
+        for key in ("summary", "bases", "fields"):
+            if s.get(key):
+                out[key] = s[key]
+        if s.get("calls"):
+            calls = []
+            for name in s["calls"]:
+                target = resolve(definitions.get(name, []), rel_path)
+                calls.append({"name": name, "path": target["path"], "line": target["line_start"]} if target else {"name": name})
+            out["calls"] = calls
+        return out
+
+    def remove_folder(self, folder_rel: str):
+        entry = self.folders.pop(folder_rel, None)
+        if entry is not None:
+            (self.directory / entry["shard"]).unlink(missing_ok=True)
+            self._changed = True
+
+    def reset(self):
+        """Drops every shard, for a full re-export."""
+        self.remove()
+        self._folders = {}
+        self._changed = True
+
+    def save(self, root_name: str):
+        """Writes the manifest if any folder changed since the last save."""
+        if not self._changed:
+            return
+        manifest = {
+            "format": "ccb-index",
+            "version": EXPORT_VERSION,
+            "root": root_name,
+            "folders": dict(sorted(self.folders.items())),
+        }
+        self.directory.mkdir(parents=True, exist_ok=True)
+        atomic_write(self.directory / MANIFEST, json.dumps(manifest, separators=(",", ":"), ensure_ascii=False))
+        self._changed = False
+
+    def remove(self) -> bool:
+        """Deletes the manifest and the shards it lists, then the directories they leave empty.
+
+        The export directory may be shared with other files (EXPORT_DIR, `ccb export -o`), so nothing
+        the exporter didn't write is touched. Returns whether there was a manifest.
+        """
+        manifest = self._read_manifest()
+        if not manifest:
+            return False
+        shards = self.directory / "shards"
+        for entry in (manifest.get("folders") or {}).values():
+            shard = entry.get("shard") if isinstance(entry, dict) else None
+            path = self.directory / shard if isinstance(shard, str) else None
+            # Only files inside shards/, whatever a hand-edited manifest says
+            if path is not None and path.parent == shards:
+                path.unlink(missing_ok=True)
+        (self.directory / MANIFEST).unlink(missing_ok=True)
+        for directory in (shards, self.directory):
+            try:
+                directory.rmdir()
+            except OSError:
+                pass
+        return True
@@ -0,0 +1,53 @@
+import pathlib
+import subprocess
+from dataclasses import dataclass, field
+from typing import List, Set, Tuple
+
+
+@dataclass
+class GitChanges:
+    """Paths (relative to the scanned root) that differ between a revision and the working tree."""
+    changed: Set[str] = field(default_factory=set)
+    deleted: Set[str] = field(default_factory=set)
+    renamed: List[Tuple[str, str]] = field(default_factory=list)
+
+
+def _git(root: pathlib.Path, *args: str) -> str:
+    try:
+        result = subprocess.run(["git", "-C", str(root), *args], capture_output=True, text=True, check=False)
+    except FileNotFoundError:
+        raise ValueError("git executable not found")
+    if result.returncode != 0:
+        raise ValueError(result.stderr.strip() or f"git {args[0]} failed")
+    return result.stdout
+
+
+def git_changes(root: pathlib.Path, rev: str) -> GitChanges:
+    """Changes since rev: committed, staged and unstaged edits plus untracked (non-ignored) files.
+
+    Renames are detected with -M so their registry rows can be moved instead of re-parsed.
+    """
+    changes = GitChanges()
+    # --relative limits the diff to root and prints paths relative to it
+    tokens = _git(root, "diff", "--name-status", "-M", "-z", "--relative", rev, "--").split("\0")
+    i = 0
+    while i < len(tokens) and tokens[i]:
+        status = tokens[i][0]
+        if status in "RC":
+            old, new = tokens[i + 1], tokens[i + 2]
+            i += 3
+            if status == "R":
+                changes.renamed.append((old, new))
+            changes.changed.add(new)
+        else:
+            path = tokens[i + 1]
+            i += 2
+            if status == "D":
+                changes.deleted.add(path)
+            else:
+                changes.changed.add(path)
+
+    for path in _git(root, "ls-files", "--others", "--exclude-standard", "-z").split("\0"):
+        if path:
+            changes.changed.add(path)
+    return changes
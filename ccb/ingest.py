@@ -0,0 +1,65 @@
+import mmap
+import pathlib
+from typing import Optional, Tuple, Union
+from .config import config
+
+# Files at least this large are mapped instead of read, so hashing or skipping them needs no heap copy
+MMAP_MIN_BYTES = 256 * 1024
+# Minified/generated detection only looks at the start of a file
+SAMPLE_BYTES = 64 * 1024
+HEAD_BYTES = 2048
+# Average line length (bytes) above which a file counts as minified
+MINIFIED_LINE_LENGTH = 300
+GENERATED_MARKERS = (b"@generated", b"do not edit", b"code generated", b"autogenerated", b"auto-generated")
+
+Buffer = Union[bytes, mmap.mmap]
+
+FULL, SIGNATURES, SKIP = "full", "signatures", "skip"
+
+
+def read_source(path: pathlib.Path, size: int) -> Buffer:
+    """The file's bytes, memory-mapped when large. Callers close mapped buffers (see release)."""
+    with open(path, "rb") as f:
+        if size >= MMAP_MIN_BYTES:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return f.read()
+
+
+def release(buf: Buffer):
+    if isinstance(buf, mmap.mmap):
+        buf.close()
+
+
+def classify(buf: Buffer, size: int) -> Optional[str]:
+    """'minified', 'generated' or 'large' for files that shouldn't be indexed in full, None otherwise."""
+    if config.detect_generated and size:
+        sample = buf[:SAMPLE_BYTES]
+        if len(sample) >= HEAD_BYTES and len(sample) / (sample.count(b"\n") + 1) > MINIFIED_LINE_LENGTH:
+            return "minified"
+        head = sample[:HEAD_BYTES].lower()
+        if any(marker in head for marker in GENERATED_MARKERS):
+            return "generated"
+    if config.max_file_kb and size > config.max_file_kb * 1024:
+        return "large"
+    return None
+
+
+def triage(buf: Buffer, size: int) -> Tuple[str, Optional[str]]:
+    """How much of a file to index (FULL, SIGNATURES or SKIP) plus the note rendered for it.
+
+    Minified files are skipped; generated and oversized ones keep their signatures (no calls, no LLM
+    summaries), or are skipped too when LARGE_FILE_MODE=skip.
+    """
+    kind = classify(buf, size)
+    if kind is None:
+        return FULL, None
+    label = f"Large file ({size / 1024 / 1024:.1f} MB)" if kind == "large" else f"{kind.capitalize()} file"
+    if kind == "minified" or config.large_file_mode == SKIP:
+        return SKIP, f"{label}, not indexed"
+    return SIGNATURES, f"{label}, signatures only"
+
+
+def decode_check(source: bytes):
+    """Raises UnicodeDecodeError for non-UTF-8 files; pure ASCII (the common case) skips the decode."""
+    if not source.isascii():
+        source.decode("utf-8")
@@ -1,3 +1,123 @@
+import json
+import httpx
+from typing import Callable, Dict, List, Optional, Tuple
+from ..config import config
+
+
 class BaseLLMProvider:
-    def summarize(self, context: str, symbol_code: str) -> str:
+    name = "base"
+
+    def __init__(self):
+        self._client: Optional[httpx.Client] = None
+        # Called with (prompt tokens, completion tokens) after each successful async request
+        self.on_usage: Optional[Callable[[int, int], None]] = None
+
+    @property
+    def configured(self) -> bool:
+        """Whether there is an endpoint to send requests to; summarization is skipped without one."""
+        return bool(config.llm.base_url)
+
+    def build_prompt(self, context: str, symbol_code: str) -> str:
+        return f"Summarize this code from {context}. Intent only, 1-2 sentences. No preambles.\n\nCode:\n{symbol_code}"
+
+    def build_batch_prompt(self, context: str, items: List[Tuple[str, str]]) -> str:
+        """Prompt for several (id, code) symbols of one file, answered as a JSON array."""
+        parts = [
+            f"Summarize each code symbol below from {context}. Intent only, 1-2 sentences each. No preambles.",
+            'Respond with only a JSON array containing one object per symbol: [{"id": "<id>", "summary": "<summary>"}].',
+        ]
+        for symbol_id, code in items:
+            parts.append(f"### id: {symbol_id}\n{code}")
+        return "\n\n".join(parts)
+
+    def parse_batch_response(self, text: str, ids: List[str]) -> Dict[str, str]:
+        """Maps ids to summaries; raises ValueError when the response isn't the requested JSON array."""
+        start, end = text.find("["), text.rfind("]")
+        if start == -1 or end < start:
+            raise ValueError("no JSON array in batched response")
+        data = json.loads(text[start:end + 1])
+        if not isinstance(data, list):
+            raise ValueError("batched response is not a JSON array")
+
+        wanted = set(ids)
+        summaries = {}
+        for item in data:
+            if not isinstance(item, dict):
+                continue
+            symbol_id, summary = item.get("id"), item.get("summary")
+            if symbol_id in wanted and isinstance(summary, str) and summary.strip():
+                summaries[symbol_id] = summary.strip()
+        return summaries
+
+    def build_request(self, prompt: str) -> Tuple[str, Dict, Dict]:
+        """Returns (url, json payload, headers) for a single completion request."""
         raise NotImplementedError()
+
+    def parse_response(self, data: Dict) -> Optional[str]:
+        raise NotImplementedError()
+
+    def parse_usage(self, data: Dict) -> Tuple[int, int]:
+        """(prompt tokens, completion tokens) reported by the server, zeros when it doesn't say."""
+        return 0, 0
+
+    def complete(self, prompt: str) -> Optional[str]:
+        url, payload, headers = self.build_request(prompt)
+        try:
+            # One pooled client per provider so consecutive calls reuse connections
+            if self._client is None:
+                self._client = httpx.Client(timeout=config.llm.timeout)
+            response = self._client.post(url, json=payload, headers=headers)
+            return self.parse_response(response.json())
+        except Exception:
+            return None
+
+    async def acomplete(self, client: httpx.AsyncClient, prompt: str) -> Optional[str]:
+        """Single async attempt; raises httpx errors so the caller can decide whether to retry."""
+        url, payload, headers = self.build_request(prompt)
+        response = await client.post(url, json=payload, headers=headers)
+        response.raise_for_status()
+        data = response.json()
+        if self.on_usage is not None:
+            self.on_usage(*self.parse_usage(data))
+        return self.parse_response(data)
+
+    def summarize(self, context: str, symbol_code: str) -> Optional[str]:
+        return self.complete(self.build_prompt(context, symbol_code))
+
+    async def asummarize(self, client: httpx.AsyncClient, context: str, symbol_code: str) -> Optional[str]:
+        return await self.acomplete(client, self.build_prompt(context, symbol_code))
+
+    def summarize_batch(self, context: str, items: List[Tuple[str, str]]) -> List[Optional[str]]:
+        """Summarizes (name, code) items in one request, falling back to per-symbol calls for anything missing."""
+        ids = batch_ids([name for name, _ in items])
+        text = self.complete(self.build_batch_prompt(context, list(zip(ids, [code for _, code in items]))))
+        try:
+            summaries = self.parse_batch_response(text or "", ids)
+        except ValueError:
+            summaries = {}
+        return [summaries.get(i) or self.summarize(context, code) for i, (_, code) in zip(ids, items)]
+
+    async def asummarize_batch(self, client: httpx.AsyncClient, context: str, items: List[Tuple[str, str]]) -> List[Optional[str]]:
+        """Single async batched attempt; entries are None where the response was malformed or incomplete."""
+        ids = batch_ids([name for name, _ in items])
+        text = await self.acomplete(client, self.build_batch_prompt(context, list(zip(ids, [code for _, code in items]))))
+        try:
+            summaries = self.parse_batch_response(text or "", ids)
+        except ValueError:
+            summaries = {}
+        return [summaries.get(i) for i in ids]
+
+    def close(self):
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+
+def batch_ids(names: List[str]) -> List[str]:
+    """Symbol names made unique within a batch (overloads and same-named methods get #2, #3...)."""
+    seen: Dict[str, int] = {}
+    ids = []
+    for name in names:
+        seen[name] = seen.get(name, 0) + 1
+        ids.append(name if seen[name] == 1 else f"{name}#{seen[name]}")
+    return ids
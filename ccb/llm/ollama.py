@@ -1,21 +1,23 @@
-import httpx
 from .base import BaseLLMProvider
 from ..config import config
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
 class OllamaProvider(BaseLLMProvider):
-    def summarize(self, context: str, symbol_code: str) -> Optional[str]:
-        prompt = f"Summarize this code from {context}. Intent only, 1-2 sentences. No preambles.\n\nCode:\n{symbol_code}"
-        try:
-            with httpx.Client(timeout=30.0) as client:
-                response = client.post(
-                    f"{config.llm.base_url}/api/generate",
-                    json={
-                        "model": config.llm.model,
-                        "prompt": prompt,
-                        "stream": False
-                    }
-                )
-                return response.json().get("response", "").strip()
-        except:
-            return None
+    name = "ollama"
+
+    def build_request(self, prompt: str) -> Tuple[str, Dict, Dict]:
+        return (
+            f"{config.llm.base_url}/api/generate",
+            {
+                "model": config.llm.model,
+                "prompt": prompt,
+                "stream": False
+            },
+            {},
+        )
+
+    def parse_response(self, data: Dict) -> Optional[str]:
+        return data.get("response", "").strip()
+
+    def parse_usage(self, data: Dict) -> Tuple[int, int]:
+        return data.get("prompt_eval_count", 0), data.get("eval_count", 0)
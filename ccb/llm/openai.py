@@ -1,22 +1,29 @@
-import httpx
 from .base import BaseLLMProvider
 from ..config import config
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
 class OpenAIProvider(BaseLLMProvider):
-    def summarize(self, context: str, symbol_code: str) -> Optional[str]:
-        prompt = f"Summarize this code from {context}. Intent only, 1-2 sentences. No preambles.\n\nCode:\n{symbol_code}"
+    name = "openai"
+
+    @property
+    def configured(self) -> bool:
+        # The hosted API is the default endpoint, usable once there is a key for it
+        return bool(config.llm.base_url or config.llm.api_key)
+
+    def build_request(self, prompt: str) -> Tuple[str, Dict, Dict]:
         base_url = config.llm.base_url or "https://api.openai.com/v1"
-        try:
-            with httpx.Client(timeout=30.0) as client:
-                response = client.post(
-                    f"{base_url}/chat/completions",
-                    json={
-                        "model": config.llm.model,
-                        "messages": [{"role": "user", "content": prompt}]
-                    },
-                    headers={"Authorization": f"Bearer {config.llm.api_key}"}
-                )
-                return response.json()["choices"][0]["message"]["content"].strip()
-        except:
-            return None
+        return (
+            f"{base_url}/chat/completions",
+            {
+                "model": config.llm.model,
+                "messages": [{"role": "user", "content": prompt}]
+            },
+            {"Authorization": f"Bearer {config.llm.api_key}"},
+        )
+
+    def parse_response(self, data: Dict) -> Optional[str]:
+        return data["choices"][0]["message"]["content"].strip()
+
+    def parse_usage(self, data: Dict) -> Tuple[int, int]:
+        usage = data.get("usage") or {}
+        return usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
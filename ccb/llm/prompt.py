@@ -0,0 +1,149 @@
+import posixpath
+from typing import Dict, List, Optional
+from ..config import config
+from ..parsers.base import load_code
+
+# Bump whenever the summarization prompts change so cached summaries from old prompts aren't reused
+PROMPT_VERSION = 1
+
+COMMENT_PREFIXES = ("#", "//", "/*", "*")
+DOCSTRING_QUOTES = ('"""', "'''")
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token holds well enough for code across common tokenizers
+    return len(text) // 4 + 1
+
+
+def compacts(code: str, max_tokens: Optional[int] = None) -> bool:
+    """Whether compact_code sends a skeleton instead of this code."""
+    max_tokens = config.llm.prompt_max_tokens if max_tokens is None else max_tokens
+    return bool(max_tokens) and estimate_tokens(code) > max_tokens
+
+
+def direct_members(symbol: Dict, symbols: List[Dict]) -> List[Dict]:
+    """Symbols nested in `symbol` but not inside another of its members, in source order."""
+    start, end = symbol["byte_start"], symbol["byte_end"]
+    members: List[Dict] = []
+    for s in sorted(symbols, key=lambda s: (s["byte_start"], -s["byte_end"])):
+        if start <= s["byte_start"] and s["byte_end"] <= end and (s["byte_start"], s["byte_end"]) != (start, end):
+            if not members or s["byte_start"] >= members[-1]["byte_end"]:
+                members.append(s)
+    return members
+
+
+def _blocks(lines: List[str], member_lines: set) -> List[List[int]]:
+    """Groups line indices into the units a skeleton keeps or drops whole; blank lines belong to none."""
+    blocks = []
+    i = 0
+    while i < len(lines):
+        stripped = lines[i].strip()
+        if not stripped:
+            i += 1
+            continue
+        end = i
+        closing = next((q for q in DOCSTRING_QUOTES if stripped.startswith(q)), None)
+        if closing is None and stripped.startswith("/*"):
+            closing = "*/"
+        if closing is not None and i not in member_lines:
+            # A docstring or block comment runs to the line holding its closing delimiter
+            rest = stripped[len(closing):]
+            while closing not in rest and end + 1 < len(lines):
+                end += 1
+                rest = lines[end]
+        blocks.append(list(range(i, end + 1)))
+        i = end + 1
+    return blocks
+
+
+def _render(lines: List[str], keep: List[bool], comment: str) -> str:
+    """Kept lines in order, each run of dropped lines replaced by one marker at that run's indentation.
+
+    Blank lines survive only between two kept lines, so dropped regions don't leave gaps behind.
+    """
+    def marker():
+        return f"{indent}{comment} ... ({omitted} line{'s' if omitted != 1 else ''} omitted)"
+
+    out = []
+    omitted, indent, blank = 0, "", False
+    for i, line in enumerate(lines):
+        if not line.strip():
+            blank = True
+            continue
+        if keep[i]:
+            if omitted:
+                out.append(marker())
+                omitted = 0
+            elif blank and out:
+                out.append("")
+            out.append(line)
+        else:
+            if not omitted:
+                indent = line[:len(line) - len(line.lstrip())]
+            omitted += 1
+        blank = False
+    if omitted:
+        out.append(marker())
+    return "\n".join(out)
+
+
+def compact_code(source: bytes, symbol: Dict, symbols: List[Dict], rel_path: str,
+                 max_tokens: Optional[int] = None) -> str:
+    """What the LLM is shown for one symbol: its code when that fits max_tokens, otherwise a skeleton.
+
+    The skeleton is the symbol's code with every direct member collapsed to one line (its signature,
+    plus its summary when it already has one). The signature, docstrings, comments and member lines are
+    kept first; the rest of the body fills the remaining budget in order, and omitted runs are marked.
+    """
+    max_tokens = config.llm.prompt_max_tokens if max_tokens is None else max_tokens
+    code = load_code(source, symbol)
+    if not compacts(code, max_tokens):
+        return code
+
+    comment = "#" if posixpath.splitext(rel_path)[1] == ".py" else "//"
+    parts = []
+    member_lines = set()
+    newlines = 0
+    pos = symbol["byte_start"]
+    for m in direct_members(symbol, symbols):
+        parts.append(source[pos:m["byte_start"]].decode("utf-8", errors="replace"))
+        newlines += parts[-1].count("\n")
+        member_lines.add(newlines)
+        line = m["signature"].rstrip(" {")
+        if m.get("summary"):
+            line += f"  {comment} {m['summary'].splitlines()[0]}"
+        parts.append(line)
+        pos = m["byte_end"]
+    parts.append(source[pos:symbol["byte_end"]].decode("utf-8", errors="replace"))
+    lines = "".join(parts).split("\n")
+
+    essential, body = [], []
+    for block in _blocks(lines, member_lines):
+        first = block[0]
+        if first == 0 or first in member_lines or lines[first].lstrip().startswith(COMMENT_PREFIXES + DOCSTRING_QUOTES):
+            essential.append(block)
+        else:
+            body.append(block)
+
+    # Pick blocks by size first (characters, at the ~4 per token of estimate_tokens), then drop the last
+    # picked until the rendered skeleton, markers included, fits
+    budget = max_tokens * 4
+    keep = [False] * len(lines)
+    picked = []
+    for n, block in enumerate(essential + body):
+        size = sum(len(lines[i]) + 1 for i in block)
+        if block[0] != 0 and size > budget:
+            # Essentials that don't fit are skipped; the body is a prefix, so it stops here
+            if n >= len(essential):
+                break
+            continue
+        for i in block:
+            keep[i] = True
+        picked.append(block)
+        budget -= size
+    text = _render(lines, keep, comment)
+    while estimate_tokens(text) > max_tokens and len(picked) > 1:
+        for i in picked.pop():
+            keep[i] = False
+        text = _render(lines, keep, comment)
+    return text
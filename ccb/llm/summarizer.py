@@ -0,0 +1,174 @@
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Iterator, List, Optional, Tuple
+import httpx
+from .base import BaseLLMProvider
+from .prompt import estimate_tokens
+from ..config import config
+from ..metrics import Metrics
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+# Wrong key, model or endpoint: every further request would fail the same way
+UNAVAILABLE_STATUS = {401, 403, 404}
+
+
+def plan_batches(items: List[Tuple[str, str]], batch_size: int, max_tokens: int) -> Iterator[List[Tuple[str, str]]]:
+    """Groups (name, code) items into batches bounded by item count and estimated prompt tokens."""
+    batch, tokens = [], 0
+    for item in items:
+        cost = estimate_tokens(item[1])
+        if batch and (len(batch) >= batch_size or tokens + cost > max_tokens):
+            yield batch
+            batch, tokens = [], 0
+        batch.append(item)
+        tokens += cost
+    if batch:
+        yield batch
+
+
+class RateLimiter:
+    """Spaces request starts to at most `rate` per second (0 disables limiting)."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.next_slot = 0.0
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        if not self.interval:
+            return
+        async with self.lock:
+            now = time.monotonic()
+            wait = self.next_slot - now
+            self.next_slot = max(now, self.next_slot) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class AsyncSummarizer:
+    """Runs LLM summaries concurrently on a background event loop.
+
+    `submit` returns a concurrent Future immediately so the caller can keep parsing while
+    requests are in flight. All requests share one pooled httpx.AsyncClient.
+    """
+
+    def __init__(self, provider: BaseLLMProvider, concurrency: Optional[int] = None,
+                 rate_limit: Optional[float] = None, max_retries: Optional[int] = None,
+                 client: Optional[httpx.AsyncClient] = None, metrics: Optional[Metrics] = None):
+        self.provider = provider
+        self.concurrency = max(1, concurrency or config.llm.concurrency)
+        self.rate_limit = config.llm.rate_limit if rate_limit is None else rate_limit
+        self.max_retries = config.llm.max_retries if max_retries is None else max_retries
+        self.client = client
+        self.metrics = metrics or Metrics(enabled=False)
+        self.unavailable = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def _start(self):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="ccb-summarizer", daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._setup(), self._loop).result()
+
+    async def _setup(self):
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._limiter = RateLimiter(self.rate_limit)
+        self._owns_client = self.client is None
+        if self.client is None:
+            limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+            self.client = httpx.AsyncClient(timeout=config.llm.timeout, limits=limits)
+
+    def submit(self, context: str, symbol_code: str) -> Future:
+        if self._loop is None:
+            self._start()
+        return asyncio.run_coroutine_threadsafe(self._summarize(context, symbol_code), self._loop)
+
+    def submit_batch(self, context: str, items: List[Tuple[str, str]]) -> Future:
+        """Summarizes (name, code) items of one file in a single request; the future yields summaries in item order."""
+        if self._loop is None:
+            self._start()
+        return asyncio.run_coroutine_threadsafe(self._summarize_batch(context, items), self._loop)
+
+    async def _summarize(self, context: str, symbol_code: str) -> Optional[str]:
+        return await self._request(lambda: self.provider.asummarize(self.client, context, symbol_code))
+
+    async def _summarize_batch(self, context: str, items: List[Tuple[str, str]]) -> List[Optional[str]]:
+        if len(items) == 1:
+            return [await self._summarize(context, items[0][1])]
+
+        results = await self._request(lambda: self.provider.asummarize_batch(self.client, context, items))
+        if results is None:
+            # The request itself failed after retries; per-symbol calls would only fail the same way
+            return [None] * len(items)
+
+        # Malformed or incomplete batched answer: fall back to one request per missing symbol
+        missing = [i for i, summary in enumerate(results) if not summary]
+        if missing:
+            fallback = await asyncio.gather(*(self._summarize(context, items[i][1]) for i in missing))
+            for i, summary in zip(missing, fallback):
+                results[i] = summary
+        return results
+
+    async def _request(self, call: Callable[[], Awaitable]):
+        async with self._semaphore:
+            for attempt in range(self.max_retries + 1):
+                if self.unavailable:
+                    return None
+                await self._limiter.acquire()
+                start = time.perf_counter()
+                ok = False
+                try:
+                    result = await call()
+                    ok = True
+                    return result
+                except httpx.HTTPStatusError as e:
+                    status = e.response.status_code
+                    if status in UNAVAILABLE_STATUS:
+                        self._disable(f"LLM provider rejected the request (HTTP {status})")
+                    if status not in RETRYABLE_STATUS or attempt == self.max_retries:
+                        return None
+                    delay = self._retry_after(e.response) or self._backoff(attempt)
+                except (httpx.TimeoutException, httpx.NetworkError) as e:
+                    if attempt == self.max_retries:
+                        if isinstance(e, httpx.ConnectError):
+                            self._disable(f"LLM provider unreachable ({e})")
+                        return None
+                    delay = self._backoff(attempt)
+                except Exception as e:
+                    # Bad URL or protocol, or a response in a shape the provider doesn't understand
+                    self._disable(f"LLM request failed ({type(e).__name__}: {e})")
+                    return None
+                finally:
+                    self.metrics.llm_request(time.perf_counter() - start, ok)
+                await asyncio.sleep(delay)
+        return None
+
+    def _disable(self, reason: str):
+        # Stop sending requests that can't succeed; remaining symbols stay pending for the next run
+        if not self.unavailable:
+            self.unavailable = True
+            print(f"{reason}; skipping remaining summaries.")
+
+    def _backoff(self, attempt: int) -> float:
+        return min(30.0, 0.5 * (2 ** attempt)) * (0.5 + random.random() / 2)
+
+    def _retry_after(self, response: httpx.Response) -> Optional[float]:
+        try:
+            return min(60.0, float(response.headers.get("retry-after", "")))
+        except ValueError:
+            return None
+
+    def close(self):
+        if self._loop is None:
+            return
+        if self._owns_client:
+            asyncio.run_coroutine_threadsafe(self.client.aclose(), self._loop).result()
+            self.client = None
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
@@ -0,0 +1,47 @@
+import fcntl
+import os
+import pathlib
+import threading
+from typing import Optional
+
+
+class WriteLock:
+    """Exclusive advisory lock (flock) serializing everything that writes the registry and context files.
+
+    Held by scans, merges, exports and watch/daemon updates, so two processes (or two daemon
+    clients) never render the same `.context.md` at once. Reentrant within a process: nested
+    holders, e.g. a daemon request that runs a scan, share the one flock.
+    """
+
+    def __init__(self, path: Optional[pathlib.Path] = None):
+        self.path = path or pathlib.Path(".code-index/write.lock")
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._fd: Optional[int] = None
+
+    def __enter__(self):
+        self._lock.acquire()
+        if self._depth == 0:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            except BaseException:
+                if self._fd is not None:
+                    os.close(self._fd)
+                    self._fd = None
+                self._lock.release()
+                raise
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc):
+        self._depth -= 1
+        if self._depth == 0:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+        self._lock.release()
+
+
+write_lock = WriteLock()
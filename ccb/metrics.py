@@ -0,0 +1,180 @@
+import json
+import time
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+
+class _Timer:
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics: "Metrics", name: str):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.metrics.add_time(self.name, time.perf_counter() - self.start)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc):
+        pass
+
+
+NULL_TIMER = _NullTimer()
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class Metrics:
+    """Per-phase timers and counters for one scan.
+
+    A disabled instance (the default on Scanner) hands out a shared no-op timer and returns
+    immediately from every recording call, so instrumented code paths cost next to nothing.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.phases: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        # suffix -> [files, bytes, tree-sitter parse seconds, symbol extraction seconds]
+        self.languages: Dict[str, List[float]] = {}
+        self.files: List[Tuple[float, str]] = []
+        self.llm_latencies: List[float] = []
+        self.llm_failures = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.started = time.perf_counter()
+
+    def phase(self, name: str):
+        return _Timer(self, name) if self.enabled else NULL_TIMER
+
+    def add_time(self, name: str, seconds: float):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def timed(self, name: str, iterable: Iterable) -> Iterable:
+        """Charges the time spent producing each item (e.g. walking the tree) to a phase."""
+        if not self.enabled:
+            return iterable
+        return self._timed(name, iter(iterable))
+
+    def _timed(self, name: str, it: Iterator) -> Iterator:
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(it)
+            except StopIteration:
+                self.add_time(name, time.perf_counter() - start)
+                return
+            self.add_time(name, time.perf_counter() - start)
+            yield item
+
+    def count(self, name: str, n: int = 1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def parsed(self, rel_path: str, suffix: str, size: int, parse_s: float, extract_s: float):
+        if not self.enabled:
+            return
+        stats = self.languages.setdefault(suffix, [0, 0, 0.0, 0.0])
+        stats[0] += 1
+        stats[1] += size
+        stats[2] += parse_s
+        stats[3] += extract_s
+        # Worker CPU time; with --jobs > 1 these can add up to more than the wall clock
+        self.add_time("tree_sitter", parse_s)
+        self.add_time("extract", extract_s)
+        self.files.append((parse_s + extract_s, rel_path))
+
+    def llm_request(self, seconds: float, ok: bool):
+        if not self.enabled:
+            return
+        self.llm_latencies.append(seconds)
+        if not ok:
+            self.llm_failures += 1
+
+    def llm_usage(self, prompt_tokens: int, completion_tokens: int):
+        if self.enabled:
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+
+    def report(self, slowest: int = 10) -> Dict:
+        latencies = self.llm_latencies
+        counters = self.counters
+        summary_lookups = counters.get("summary_cache_hits", 0) + counters.get("summary_cache_misses", 0)
+        files_seen = counters.get("stat_unchanged", 0) + counters.get("hash_unchanged", 0) + counters.get("parsed", 0)
+        return {
+            "total_s": round(time.perf_counter() - self.started, 4),
+            "phases_s": {name: round(s, 4) for name, s in sorted(self.phases.items(), key=lambda kv: -kv[1])},
+            "counters": dict(sorted(counters.items())),
+            "cache": {
+                "stat_fast_path_rate": round(counters.get("stat_unchanged", 0) / files_seen, 4) if files_seen else 0.0,
+                "unchanged_rate": round((counters.get("stat_unchanged", 0) + counters.get("hash_unchanged", 0)) / files_seen, 4) if files_seen else 0.0,
+                "summary_hit_rate": round(counters.get("summary_cache_hits", 0) / summary_lookups, 4) if summary_lookups else 0.0,
+            },
+            "languages": {
+                suffix: {
+                    "files": int(files), "bytes": int(size), "parse_s": round(parse_s, 4), "extract_s": round(extract_s, 4),
+                    "files_per_s": round(files / (parse_s + extract_s), 1) if parse_s + extract_s else 0.0,
+                    "bytes_per_s": round(size / (parse_s + extract_s)) if parse_s + extract_s else 0,
+                }
+                for suffix, (files, size, parse_s, extract_s) in sorted(self.languages.items())
+            },
+            "llm": {
+                "requests": len(latencies),
+                "failures": self.llm_failures,
+                "latency_s": {
+                    "p50": round(percentile(latencies, 50), 4),
+                    "p90": round(percentile(latencies, 90), 4),
+                    "p99": round(percentile(latencies, 99), 4),
+                    "max": round(max(latencies), 4) if latencies else 0.0,
+                },
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+            },
+            "slowest_files": [
+                {"path": path, "seconds": round(seconds, 4)} for seconds, path in sorted(self.files, reverse=True)[:slowest]
+            ],
+        }
+
+    def write_json(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+
+    def print_report(self):
+        report = self.report()
+        print(f"\nScan stats ({report['total_s']:.2f}s total)")
+        print("Phases:")
+        for name, seconds in report["phases_s"].items():
+            print(f"  {name:<14}{seconds:>10.3f}s")
+        print("Counters: " + ", ".join(f"{k}={v}" for k, v in report["counters"].items()))
+        cache = report["cache"]
+        print(f"Cache: stat fast path {cache['stat_fast_path_rate']:.0%}, unchanged {cache['unchanged_rate']:.0%}, "
+              f"summaries {cache['summary_hit_rate']:.0%} hit")
+        if report["languages"]:
+            print("Parsing (per language, parse + extract time):")
+            for suffix, lang in report["languages"].items():
+                print(f"  {suffix:<8}{lang['files']:>7} files {lang['bytes'] / 1024:>10.0f} KiB "
+                      f"{lang['parse_s']:>8.3f}s + {lang['extract_s']:.3f}s "
+                      f"{lang['files_per_s']:>10.1f} files/s {lang['bytes_per_s'] / 1024:>10.0f} KiB/s")
+        llm = report["llm"]
+        if llm["requests"]:
+            lat = llm["latency_s"]
+            print(f"LLM: {llm['requests']} requests ({llm['failures']} failed), latency p50 {lat['p50'] * 1000:.0f} ms "
+                  f"p90 {lat['p90'] * 1000:.0f} ms p99 {lat['p99'] * 1000:.0f} ms, "
+                  f"tokens {llm['prompt_tokens']} in / {llm['completion_tokens']} out")
+        if report["slowest_files"]:
+            print("Slowest files:")
+            for f in report["slowest_files"]:
+                print(f"  {f['seconds'] * 1000:>9.1f} ms  {f['path']}")
@@ -0,0 +1,32 @@
+from typing import Dict
+
+# Language id -> file extensions. Grammars are only imported once a matching file is seen.
+PARSER_SPECS = [
+    ('python', ['.py']),
+    ('go', ['.go']),
+    ('java', ['.java']),
+    ('typescript', ['.ts', '.tsx', '.js', '.jsx']),
+    ('cpp', ['.cpp', '.hpp', '.cc', '.cxx', '.cu', '.cuh']),
+    ('c', ['.c', '.h']),
+]
+
+# Parsers built so far in this process, keyed by extension
+_parsers: Dict[str, object] = {}
+
+
+def supports(suffix: str) -> bool:
+    return any(suffix in exts for _, exts in PARSER_SPECS)
+
+
+def get_parser(suffix: str):
+    """Returns the UniversalParser for an extension, building it (and loading its grammar) on first use."""
+    if suffix not in _parsers:
+        spec = next((s for s in PARSER_SPECS if suffix in s[1]), None)
+        if not spec:
+            return None
+        parser = next((p for p in _parsers.values() if p.lang_id == spec[0]), None)
+        if parser is None:
+            from .universal import UniversalParser
+            parser = UniversalParser(*spec)
+        _parsers[suffix] = parser
+    return _parsers[suffix]
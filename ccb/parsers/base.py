@@ -1,8 +1,11 @@
 from dataclasses import dataclass, asdict
-from typing import List, Optional, Dict
-from tree_sitter import Node
+from typing import List, Optional, Dict, Tuple, TYPE_CHECKING
 
-@dataclass
+if TYPE_CHECKING:
+    # Only for annotations; importing tree_sitter here would defeat lazy grammar loading
+    from tree_sitter import Node
+
+@dataclass(slots=True)
 class SymbolInfo:
     name: str
     type: str 
@@ -11,7 +14,9 @@ class SymbolInfo:
     line_start: int
     line_end: int
     is_public: bool
-    code: str
+    # Byte span of the symbol in its file; the code itself is loaded on demand via load_code
+    byte_start: int
+    byte_end: int
     summary: Optional[str] = None
     bases: List[str] = None
     fields: List[str] = None
@@ -20,6 +25,10 @@ class SymbolInfo:
     def to_dict(self):
         return asdict(self)
 
+def load_code(source: bytes, symbol: Dict) -> str:
+    """Slices a symbol's code out of its file contents using the recorded byte span."""
+    return source[symbol["byte_start"]:symbol["byte_end"]].decode('utf-8', errors='replace')
+
 class BaseParser:
     def supports(self, extension: str) -> bool:
         raise NotImplementedError()
@@ -27,9 +36,16 @@ class BaseParser:
     def parse(self, code: str, file_path: str) -> List[SymbolInfo]:
         raise NotImplementedError()
 
-    def get_signature(self, node: Node) -> str:
+    def parse_tree(self, source: bytes, old_tree=None):
+        raise NotImplementedError()
+
+    def extract_all(self, tree, source: bytes) -> Tuple[List[SymbolInfo], List[str]]:
+        """Symbols plus imported module names from a tree returned by parse_tree (source: the bytes it was parsed from)."""
+        raise NotImplementedError()
+
+    def get_signature(self, node: 'Node') -> str:
         text = node.text.decode('utf-8') if isinstance(node.text, bytes) else node.text
         return text.split('\n')[0].strip()
     
-    def get_node_text(self, node: Node) -> str:
+    def get_node_text(self, node: 'Node') -> str:
         return node.text.decode('utf-8') if isinstance(node.text, bytes) else node.text
@@ -0,0 +1,41 @@
+from typing import Dict, List
+from tree_sitter import Language, Node, Query
+
+try:
+    from tree_sitter import QueryCursor  # tree-sitter >= 0.25
+except ImportError:
+    QueryCursor = None
+
+# Node types shared by both extraction engines; types a grammar doesn't define are left out of its query
+CLASS_TYPES = ['class_definition', 'class_specifier', 'struct_specifier', 'interface_declaration']
+FUNCTION_TYPES = ['function_definition', 'function_declaration', 'method_declaration', 'method_definition']
+CALL_TYPES = ['call', 'call_expression', 'method_invocation']
+# Languages where a bare `declaration` (e.g. a prototype) counts as a function symbol
+DECLARATION_LANGS = ['cpp', 'c']
+# Python/TS imports, Go import specs, Java imports (Go's import_declaration is only a wrapper) and C/C++ includes
+IMPORT_TYPES = ['import_statement', 'import_from_statement', 'import_spec', 'import_declaration', 'preproc_include']
+
+
+def _pattern(language: Language, kinds: List[str], capture: str) -> List[str]:
+    kinds = [k for k in kinds if language.id_for_node_kind(k, True) is not None]
+    return ["[" + " ".join(f"({k})" for k in kinds) + f"] @{capture}"] if kinds else []
+
+
+def build_query(language: Language, lang_id: str) -> Query:
+    """Builds the per-language query capturing symbol definitions (@definition), call sites (@call) and imports (@import)."""
+    definitions = CLASS_TYPES + FUNCTION_TYPES + (['declaration'] if lang_id in DECLARATION_LANGS else [])
+    patterns = _pattern(language, definitions, 'definition')
+    patterns += _pattern(language, CALL_TYPES, 'call')
+    patterns += _pattern(language, IMPORT_TYPES, 'import')
+    return Query(language, "\n".join(patterns))
+
+
+def build_import_query(language: Language) -> Query:
+    """Import-only query, for the visitor engine which finds definitions and calls itself."""
+    return Query(language, "\n".join(_pattern(language, IMPORT_TYPES, 'import')))
+
+
+def run_query(query: Query, node: Node) -> Dict[str, List[Node]]:
+    if QueryCursor is not None:
+        return QueryCursor(query).captures(node)
+    return query.captures(node)
@@ -1,125 +1,222 @@
+import bisect
+import importlib
 import tree_sitter
 from tree_sitter import Node, Language
 from .base import BaseParser, SymbolInfo
-from typing import List, Optional
+from .queries import CALL_TYPES, CLASS_TYPES, DECLARATION_LANGS, FUNCTION_TYPES, build_import_query, build_query, run_query
+from ..config import config
+from typing import Callable, List, Optional, Tuple
 
-# Import official grammars
-import tree_sitter_python
-import tree_sitter_go
-import tree_sitter_java
-import tree_sitter_typescript
-import tree_sitter_cpp
-import tree_sitter_c
+# Official grammar packages, imported on first use: lang_id -> (module, language function)
+GRAMMARS = {
+    'python': ('tree_sitter_python', 'language'),
+    'go': ('tree_sitter_go', 'language'),
+    'java': ('tree_sitter_java', 'language'),
+    'typescript': ('tree_sitter_typescript', 'language_typescript'),
+    'cpp': ('tree_sitter_cpp', 'language'),
+    'c': ('tree_sitter_c', 'language'),
+}
 
 class UniversalParser(BaseParser):
-    def __init__(self, lang_id: str, extensions: List[str]):
+    def __init__(self, lang_id: str, extensions: List[str], engine: Optional[str] = None):
         self.lang_id = lang_id
         self.extensions = extensions
+        self.engine = engine or config.parser_engine
         
-        # Initialize language using the new 0.23+ API
-        if lang_id == 'python':
-            self.language = Language(tree_sitter_python.language())
-        elif lang_id == 'go':
-            self.language = Language(tree_sitter_go.language())
-        elif lang_id == 'java':
-            self.language = Language(tree_sitter_java.language())
-        elif lang_id == 'typescript':
-            self.language = Language(tree_sitter_typescript.language_typescript())
-        elif lang_id == 'cpp':
-            self.language = Language(tree_sitter_cpp.language())
-        elif lang_id == 'c':
-            self.language = Language(tree_sitter_c.language())
-        else:
+        if lang_id not in GRAMMARS:
             raise ValueError(f"Unsupported language: {lang_id}")
 
+        # Initialize language using the new 0.23+ API
+        module_name, func_name = GRAMMARS[lang_id]
+        grammar = importlib.import_module(module_name)
+        self.language = Language(getattr(grammar, func_name)())
+
         self.parser = tree_sitter.Parser(self.language)
+        self.query = build_query(self.language, lang_id) if self.engine == 'query' else None
+        self.import_query = build_import_query(self.language) if self.query is None else None
 
     def supports(self, extension: str) -> bool:
         return extension in self.extensions
 
     def parse(self, code: str, file_path: str) -> List[SymbolInfo]:
-        tree = self.parser.parse(bytes(code, "utf8"))
+        source = bytes(code, "utf8")
+        return self.extract(self.parse_tree(source), source)
+
+    def parse_tree(self, source: bytes, old_tree: Optional[tree_sitter.Tree] = None) -> tree_sitter.Tree:
+        """Parses source, reusing an already edited old_tree for an incremental reparse."""
+        return self.parser.parse(source, old_tree) if old_tree is not None else self.parser.parse(source)
+
+    def extract(self, tree: tree_sitter.Tree, source: bytes) -> List[SymbolInfo]:
+        return self.extract_all(tree, source)[0]
+
+    def extract_all(self, tree: tree_sitter.Tree, source: bytes) -> Tuple[List[SymbolInfo], List[str]]:
+        # Signatures and visibility checks slice this buffer (node byte offsets index into it) instead of
+        # copying whole definitions via node.text
+        self._source = source
         symbols = []
-        self._visit(tree.root_node, "", symbols)
-        return symbols
+        if self.query is not None:
+            import_nodes = self._extract(tree.root_node, symbols)
+        else:
+            self._visit(tree.root_node, "", symbols)
+            import_nodes = run_query(self.import_query, tree.root_node).get('import', [])
+
+        imports = set()
+        for node in import_nodes:
+            imports.update(self._get_imports(node))
+        return symbols, sorted(imports)
+
+    def _symbol_type(self, node: Node, breadcrumb: str) -> Optional[str]:
+        if node.type in CLASS_TYPES:
+            return 'class'
+        elif node.type in FUNCTION_TYPES:
+            return 'method' if breadcrumb else 'function'
+        elif node.type == 'declaration' and self.lang_id in DECLARATION_LANGS:
+            return 'function'
+        return None
+
+    def _extract(self, root: Node, symbols: List[SymbolInfo]) -> List[Node]:
+        """Query-based engine: one C-level pass collects definitions and calls, no Python recursion.
+
+        Returns the import nodes captured by the same pass.
+        """
+        captures = run_query(self.query, root)
+        # Preorder: outer definitions sort before the definitions nested inside them
+        definitions = sorted(captures.get('definition', []), key=lambda n: (n.start_byte, -n.end_byte))
+
+        calls = []
+        for call in captures.get('call', []):
+            call_name = self._get_call_name(call)
+            if call_name is not None:
+                calls.append((call.start_byte, call.end_byte, call_name))
+        calls.sort()
+        call_starts = [c[0] for c in calls]
+
+        def calls_within(node: Node) -> List[str]:
+            lo = bisect.bisect_left(call_starts, node.start_byte)
+            hi = bisect.bisect_left(call_starts, node.end_byte)
+            return sorted({c[2] for c in calls[lo:hi] if c[1] <= node.end_byte})
+
+        # Enclosing definitions as (end_byte, breadcrumb their children inherit)
+        stack = []
+        for node in definitions:
+            while stack and stack[-1][0] < node.end_byte:
+                stack.pop()
+            breadcrumb = stack[-1][1] if stack else ""
+            current_breadcrumb = self._add_symbol(node, self._symbol_type(node, breadcrumb), breadcrumb, symbols, calls_within)
+            stack.append((node.end_byte, current_breadcrumb))
+        return captures.get('import', [])
 
     def _visit(self, node: Node, breadcrumb: str, symbols: List[SymbolInfo]):
         current_breadcrumb = breadcrumb
         
-        symbol_type = None
-        if node.type in ['class_definition', 'class_specifier', 'struct_specifier', 'interface_declaration']:
-            symbol_type = 'class'
-        elif node.type in ['function_definition', 'function_declaration', 'method_declaration', 'method_definition']:
-            symbol_type = 'method' if breadcrumb else 'function'
-        elif node.type == 'declaration' and self.lang_id in ['cpp', 'c']:
-            symbol_type = 'function'
-
+        symbol_type = self._symbol_type(node, breadcrumb)
         if symbol_type:
-            name = self._get_name(node)
-            if name and self._is_public(name, node):
-                display_name = name
-                if "::" in name:
-                    parts = name.split("::")
-                    display_name = parts[1]
-                    class_name = parts[0]
-                    current_breadcrumb = f"{breadcrumb} > {class_name}" if breadcrumb else class_name
-
-                if symbol_type == 'class':
-                    current_breadcrumb = f"{breadcrumb} > {display_name}" if breadcrumb else display_name
-                
-                docstring = self._get_docstring(node)
-                
-                # Metadata
-                bases = self._get_bases(node) if symbol_type == 'class' else []
-                fields = self._get_fields(node) if symbol_type == 'class' else []
-                calls = self._get_calls(node)
-
-                symbols.append(SymbolInfo(
-                    name=display_name,
-                    type=symbol_type,
-                    signature=self.get_signature(node),
-                    breadcrumb=f"{current_breadcrumb} > {display_name}" if symbol_type == 'method' and "::" not in name else current_breadcrumb if symbol_type == 'class' else f"{breadcrumb} > {display_name}" if breadcrumb else display_name,
-                    line_start=node.start_point[0] + 1,
-                    line_end=node.end_point[0] + 1,
-                    is_public=True,
-                    code=self.get_node_text(node),
-                    summary=docstring,
-                    bases=bases,
-                    fields=fields,
-                    calls=calls
-                ))
+            current_breadcrumb = self._add_symbol(node, symbol_type, breadcrumb, symbols, self._get_calls)
 
         for child in node.children:
             self._visit(child, current_breadcrumb, symbols)
 
+    def _add_symbol(self, node: Node, symbol_type: str, breadcrumb: str, symbols: List[SymbolInfo],
+                    get_calls: Callable[[Node], List[str]]) -> str:
+        """Appends the symbol for a definition node if it is public; returns the breadcrumb for its children."""
+        current_breadcrumb = breadcrumb
+        name = self._get_name(node)
+        if name and self._is_public(name, node):
+            display_name = name
+            if "::" in name:
+                parts = name.split("::")
+                display_name = parts[1]
+                class_name = parts[0]
+                current_breadcrumb = f"{breadcrumb} > {class_name}" if breadcrumb else class_name
+
+            if symbol_type == 'class':
+                current_breadcrumb = f"{breadcrumb} > {display_name}" if breadcrumb else display_name
+            
+            docstring = self._get_docstring(node)
+            
+            # Metadata
+            bases = self._get_bases(node) if symbol_type == 'class' else []
+            fields = self._get_fields(node) if symbol_type == 'class' else []
+            calls = get_calls(node)
+
+            symbols.append(SymbolInfo(
+                name=display_name,
+                type=symbol_type,
+                signature=self.get_signature(node),
+                breadcrumb=f"{current_breadcrumb} > {display_name}" if symbol_type == 'method' and "::" not in name else current_breadcrumb if symbol_type == 'class' else f"{breadcrumb} > {display_name}" if breadcrumb else display_name,
+                line_start=node.start_point[0] + 1,
+                line_end=node.end_point[0] + 1,
+                is_public=True,
+                byte_start=node.start_byte,
+                byte_end=node.end_byte,
+                summary=docstring,
+                bases=bases,
+                fields=fields,
+                calls=calls
+            ))
+        return current_breadcrumb
+
     def _get_calls(self, root_node: Node) -> List[str]:
         calls = set()
-        call_node_types = ['call', 'call_expression', 'method_invocation']
         
         def find_calls(node: Node):
-            if node.type in call_node_types:
-                name_node = node.child_by_field_name('function') or \
-                            node.child_by_field_name('name') or \
-                            node.child_by_field_name('declarator')
-                
-                if not name_node:
-                    for child in node.children:
-                        if child.type in ['identifier', 'attribute', 'field_expression', 'member_expression']:
-                            name_node = child
-                            break
-                
-                if name_node:
-                    call_name = name_node.text.decode('utf8') if isinstance(name_node.text, bytes) else str(name_node.text)
-                    if "." in call_name: call_name = call_name.split(".")[-1]
-                    if "->" in call_name: call_name = call_name.split("->")[-1]
-                    if "::" in call_name: call_name = call_name.split("::")[-1]
+            if node.type in CALL_TYPES:
+                call_name = self._get_call_name(node)
+                if call_name is not None:
                     calls.add(call_name)
 
             for child in node.children:
                 find_calls(child)
 
         find_calls(root_node)
-        return list(calls)
+        # Sorted so results don't depend on per-process string hashing
+        return sorted(calls)
+
+    def _get_call_name(self, node: Node) -> Optional[str]:
+        name_node = node.child_by_field_name('function') or \
+                    node.child_by_field_name('name') or \
+                    node.child_by_field_name('declarator')
+        
+        if not name_node:
+            for child in node.children:
+                if child.type in ['identifier', 'attribute', 'field_expression', 'member_expression']:
+                    name_node = child
+                    break
+        
+        if not name_node:
+            return None
+        call_name = name_node.text.decode('utf8') if isinstance(name_node.text, bytes) else str(name_node.text)
+        if "." in call_name: call_name = call_name.split(".")[-1]
+        if "->" in call_name: call_name = call_name.split("->")[-1]
+        if "::" in call_name: call_name = call_name.split("::")[-1]
+        return call_name
+
+    def _get_imports(self, node: Node) -> List[str]:
+        """Module names imported by an import node: dotted Python/Java names, Go/TS module paths, include paths."""
+        if node.type == 'import_from_statement':
+            module = node.child_by_field_name('module_name')
+            return [self.get_node_text(module)] if module else []
+        if node.type == 'import_statement' and self.lang_id == 'python':
+            names = []
+            for name in node.children_by_field_name('name'):
+                if name.type == 'aliased_import':
+                    name = name.child_by_field_name('name')
+                names.append(self.get_node_text(name))
+            return names
+        if node.type == 'import_declaration':
+            if self.lang_id != 'java':
+                return []  # Go: the import_spec children carry the paths
+            names = [c for c in node.children if c.type in ['scoped_identifier', 'identifier']]
+            if not names:
+                return []
+            wildcard = any(c.type == 'asterisk' for c in node.children)
+            return [self.get_node_text(names[0]) + ('.*' if wildcard else '')]
+
+        # import_statement (TS/JS), import_spec (Go), preproc_include (C/C++)
+        path = node.child_by_field_name('source') or node.child_by_field_name('path')
+        if not path:
+            return []
+        return [self.get_node_text(path).strip('"\'`<>')]
 
     def _get_bases(self, node: Node) -> List[str]:
         bases = []
@@ -188,17 +285,21 @@ class UniversalParser(BaseParser):
         
         return " ".join(comments) if comments else None
 
+    def _head(self, node: Node, stop: bytes) -> bytes:
+        """The node's source up to the first `stop` byte sequence (or its end)."""
+        end = self._source.find(stop, node.start_byte, node.end_byte)
+        return self._source[node.start_byte:end if end != -1 else node.end_byte]
+
+    def get_signature(self, node: Node) -> str:
+        return self._head(node, b'\n').decode('utf-8').strip()
+
     def _is_public(self, name: str, node: Node) -> bool:
         if self.lang_id == 'python':
             return not name.startswith('_') or name.startswith('__')
         if self.lang_id == 'go':
             return name[0].isupper() if name else False
         if self.lang_id == 'java':
-            text = node.text
-            text_str = text.decode('utf8') if isinstance(text, bytes) else str(text)
-            return 'public' in text_str.split('{')[0]
+            return b'public' in self._head(node, b'{')
         if self.lang_id in ['cpp', 'c']:
-            text = node.text
-            text_str = text.decode('utf8') if isinstance(text, bytes) else str(text)
-            return 'static' not in text_str.split('{')[0]
+            return b'static' not in self._head(node, b'{')
         return True
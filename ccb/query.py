@@ -0,0 +1,48 @@
+import posixpath
+from typing import Dict, List, Optional
+from .registry import Registry
+
+
+def _locality(caller_path: str, definition_path: str) -> int:
+    if caller_path == definition_path:
+        return 0
+    if posixpath.dirname(caller_path) == posixpath.dirname(definition_path):
+        return 1
+    return 2
+
+
+def resolve(definitions: List[Dict], caller_path: str) -> Optional[Dict]:
+    """Picks the definition a call from caller_path most likely refers to: the only one, or the single
+    closest one (same file, then same folder). Returns None when the name stays ambiguous."""
+    if len(definitions) == 1:
+        return definitions[0]
+    ranked = sorted(definitions, key=lambda d: _locality(caller_path, d["path"]))
+    if len(ranked) > 1 and _locality(caller_path, ranked[0]["path"]) == _locality(caller_path, ranked[1]["path"]):
+        return None
+    return ranked[0] if ranked else None
+
+
+def lookup(registry: Registry, name: str, with_callees: bool = True) -> Dict:
+    """Definitions of name, each with the callers resolved to it (and what it calls); callers that
+    can't be pinned to one definition are listed separately."""
+    definitions = registry.definitions(name)
+    for d in definitions:
+        d["callers"] = []
+        if with_callees:
+            d["calls"] = registry.callees(d["path"], d["line_start"])
+
+    ambiguous = []
+    spans = {(d["path"], d["line_start"]) for d in definitions}
+    for caller in registry.callers(name):
+        if (caller["path"], caller["line_start"]) in spans:
+            continue  # recursion
+        target = resolve(definitions, caller["path"])
+        if target is None:
+            ambiguous.append(caller)
+        else:
+            target["callers"].append(caller)
+    return {"name": name, "definitions": definitions, "ambiguous_callers": ambiguous}
+
+
+def location(symbol: Dict) -> str:
+    return f"{symbol['path']}:{symbol['line_start']}-{symbol['line_end']}"
@@ -0,0 +1,453 @@
+import json
+import pathlib
+import posixpath
+import sqlite3
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    hash TEXT NOT NULL,
+    mtime_ns INTEGER,
+    size INTEGER,
+    inode INTEGER,
+    dependencies TEXT NOT NULL,
+    symbols TEXT NOT NULL,
+    note TEXT
+);
+-- Inverted symbol index, kept in step with the files table: name -> definitions, callee name -> calling symbols
+CREATE TABLE IF NOT EXISTS symbols (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    -- Folder of path ("." for the root), so per-folder lookups use an index
+    folder TEXT,
+    name TEXT NOT NULL,
+    type TEXT,
+    breadcrumb TEXT,
+    line_start INTEGER,
+    line_end INTEGER,
+    -- 1 while the symbol still waits for an LLM summary (see pending and set_summaries)
+    pending INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS symbols_name ON symbols(name);
+CREATE INDEX IF NOT EXISTS symbols_path ON symbols(path);
+CREATE TABLE IF NOT EXISTS calls (
+    symbol_id INTEGER NOT NULL,
+    callee TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS calls_callee ON calls(callee);
+CREATE INDEX IF NOT EXISTS calls_symbol ON calls(symbol_id);
+"""
+
+# Created after the upgrade so older databases have the columns by then
+UPGRADE_INDEXES = """
+CREATE INDEX IF NOT EXISTS symbols_pending ON symbols(pending) WHERE pending = 1;
+CREATE INDEX IF NOT EXISTS symbols_folder ON symbols(folder);
+"""
+
+SYMBOL_COLUMNS = ("path", "name", "type", "breadcrumb", "line_start", "line_end")
+
+# Bumped when stored rows must be re-derived from source; older rows are re-parsed once.
+# 1: dependencies come from the parse tree instead of regexes
+# 2: symbol index tables (built from the stored rows, no re-parse)
+# 3: note column for generated/minified/oversized files, which are indexed partially or not at all
+# 4: pending flag for symbols still waiting on a summary (rebuilt from the stored rows, no re-parse)
+# 5: folder column on symbols (derived from the paths, no re-parse)
+SCHEMA_VERSION = 5
+
+ENTRY_COLUMNS = "hash, mtime_ns, size, inode, dependencies, symbols, note"
+STAT_COLUMNS = ("hash", "mtime_ns", "size", "inode")
+
+
+class Registry:
+    """SQLite (WAL) store of per-file scan results.
+
+    Each file row is committed as soon as it is produced, so an interrupted scan keeps
+    everything finished so far and the next run resumes from there.
+    """
+
+    def __init__(self, path: Optional[pathlib.Path] = None, readonly: bool = False):
+        self.path = path or pathlib.Path(".code-index/registry.db")
+        # Read-only registries (daemon queries) open an existing database as is: no schema, import or upgrade
+        self.readonly = readonly
+        self.legacy_path = self.path.with_suffix(".json")
+        self._conn: Optional[sqlite3.Connection] = None
+        # (code, summary) pairs from an imported registry.json, until take_legacy_summaries collects them
+        self._legacy_summaries: List[Tuple[str, str]] = []
+        self._tracking = False
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None and self.readonly:
+            self._conn = sqlite3.connect(f"{self.path.absolute().as_uri()}?mode=ro", uri=True)
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+            self._import_legacy()
+            self._upgrade()
+            self._conn.executescript(UPGRADE_INDEXES)
+        return self._conn
+
+    def _upgrade(self):
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+        with self._conn:
+            # Before any step that (re)builds the index
+            if version < 4:
+                self._add_column("symbols", "pending", "INTEGER NOT NULL DEFAULT 0")
+            if version < 5:
+                self._add_column("symbols", "folder", "TEXT")
+            if version < 1:
+                # An empty hash never matches, so every file is parsed again (summaries still come from the cache)
+                self._conn.execute("UPDATE files SET hash = '', mtime_ns = NULL")
+            if version < 2:
+                for rel_path, symbols in self._conn.execute("SELECT path, symbols FROM files").fetchall():
+                    self._index(rel_path, json.loads(symbols))
+            if version < 3:
+                self._add_column("files", "note", "TEXT")
+                # Re-parse so the size limits and generated-file detection apply to existing rows
+                self._conn.execute("UPDATE files SET hash = '', mtime_ns = NULL")
+            if version < 4:
+                for rel_path, symbols, note in self._conn.execute("SELECT path, symbols, note FROM files").fetchall():
+                    self._index(rel_path, json.loads(symbols), pending=note is None)
+            if version < 5:
+                self._conn.executemany("UPDATE symbols SET folder = ? WHERE path = ?", [
+                    (posixpath.dirname(rel_path) or ".", rel_path)
+                    for (rel_path,) in self._conn.execute("SELECT DISTINCT path FROM symbols").fetchall()])
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _add_column(self, table: str, column: str, decl: str):
+        # Fresh databases already have the column from SCHEMA
+        if column not in [row[1] for row in self._conn.execute(f"PRAGMA table_info({table})")]:
+            self._conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+
+    def _import_legacy(self):
+        # One-time migration from the monolithic registry.json
+        if not self.legacy_path.exists():
+            return
+        try:
+            with open(self.legacy_path, "r") as f:
+                files = json.load(f).get("files", {})
+        except (OSError, ValueError):
+            files = {}
+        with self._conn:
+            for rel_path, entry in files.items():
+                if "hash" in entry and "symbols" in entry:
+                    self._write(rel_path, entry)
+                    # Imported rows are re-parsed; their summaries go to the summary cache so the LLM isn't asked again
+                    self._legacy_summaries.extend(
+                        (s["code"], s["summary"]) for s in entry["symbols"] if s.get("code") and s.get("summary"))
+        self.legacy_path.unlink()
+
+    def take_legacy_summaries(self) -> List[Tuple[str, str]]:
+        """(code, summary) pairs of the registry.json imported when the database was opened, once."""
+        self.conn  # opening the database runs the import
+        summaries, self._legacy_summaries = self._legacy_summaries, []
+        return summaries
+
+    def get(self, rel_path: str) -> Optional[Dict]:
+        row = self.conn.execute(
+            f"SELECT {ENTRY_COLUMNS} FROM files WHERE path = ?", (rel_path,)
+        ).fetchone()
+        if row is None:
+            return None
+        return self._row_to_entry(row)
+
+    def stat(self, rel_path: str) -> Optional[Dict]:
+        """Just the hash and stat fingerprint of a row; enough to tell whether a file changed."""
+        row = self.conn.execute(
+            f"SELECT {', '.join(STAT_COLUMNS)} FROM files WHERE path = ?", (rel_path,)
+        ).fetchone()
+        return dict(zip(STAT_COLUMNS, row)) if row is not None else None
+
+    def put(self, rel_path: str, entry: Dict):
+        with self.conn:
+            self._write(rel_path, entry)
+
+    def put_many(self, entries: List[Tuple[str, Dict]]):
+        """Writes several (path, entry) rows in one transaction."""
+        with self.conn:
+            for rel_path, entry in entries:
+                self._write(rel_path, entry)
+
+    def _write(self, rel_path: str, entry: Dict):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO files (path, hash, mtime_ns, size, inode, dependencies, symbols, note) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                rel_path,
+                entry["hash"],
+                entry.get("mtime_ns"),
+                entry.get("size"),
+                entry.get("inode"),
+                json.dumps(entry.get("dependencies", []), separators=(",", ":")),
+                json.dumps(entry["symbols"], separators=(",", ":")),
+                entry.get("note"),
+            ),
+        )
+        # Files with a note (generated, oversized) are never summarized
+        self._index(rel_path, entry["symbols"], pending=not entry.get("note"))
+
+    def _index(self, rel_path: str, symbols: List[Dict], pending: bool = True):
+        if self._tracking:
+            old = set(self._conn.execute("SELECT name, line_start FROM symbols WHERE path = ?", (rel_path,)))
+            new = {(s["name"], s.get("line_start")) for s in symbols}
+            self._conn.executemany("INSERT OR IGNORE INTO changed_names (name) VALUES (?)",
+                                   [(name,) for name in {name for name, _ in old ^ new}])
+        self._unindex(rel_path, track=False)
+        folder = posixpath.dirname(rel_path) or "."
+        for s in symbols:
+            cursor = self._conn.execute(
+                "INSERT INTO symbols (path, folder, name, type, breadcrumb, line_start, line_end, pending) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (rel_path, folder, s["name"], s.get("type"), s.get("breadcrumb"), s.get("line_start"), s.get("line_end"),
+                 int(pending and bool(s.get("is_public")) and not s.get("summary"))),
+            )
+            if s.get("calls"):
+                self._conn.executemany(
+                    "INSERT INTO calls (symbol_id, callee) VALUES (?, ?)", [(cursor.lastrowid, c) for c in s["calls"]]
+                )
+
+    def _unindex(self, rel_path: str, track: bool = True):
+        if track and self._tracking:
+            self._conn.execute("INSERT OR IGNORE INTO changed_names (name) SELECT name FROM symbols WHERE path = ?",
+                               (rel_path,))
+        self._conn.execute("DELETE FROM calls WHERE symbol_id IN (SELECT id FROM symbols WHERE path = ?)", (rel_path,))
+        self._conn.execute("DELETE FROM symbols WHERE path = ?", (rel_path,))
+
+    def update_stat(self, rel_path: str, entry: Dict):
+        with self.conn:
+            self.conn.execute(
+                "UPDATE files SET mtime_ns = ?, size = ?, inode = ? WHERE path = ?",
+                (entry.get("mtime_ns"), entry.get("size"), entry.get("inode"), rel_path),
+            )
+
+    def set_summaries(self, rel_path: str, summaries: Dict[Tuple[str, int], str]):
+        """Patches summaries, keyed by (name, line_start), into a stored row and clears their pending flags."""
+        with self.conn:
+            row = self.conn.execute("SELECT symbols FROM files WHERE path = ?", (rel_path,)).fetchone()
+            if row is None:
+                return
+            symbols = json.loads(row[0])
+            for s in symbols:
+                summary = summaries.get((s["name"], s.get("line_start")))
+                if summary:
+                    s["summary"] = summary
+            self.conn.execute(
+                "UPDATE files SET symbols = ? WHERE path = ?", (json.dumps(symbols, separators=(",", ":")), rel_path)
+            )
+            self.conn.executemany(
+                "UPDATE symbols SET pending = 0 WHERE path = ? AND name = ? AND line_start = ?",
+                [(rel_path, name, line) for (name, line), summary in summaries.items() if summary],
+            )
+
+    def pending(self, page_size: int) -> Iterator[List[Tuple[str, str, int]]]:
+        """Pages of (path, name, line_start) of the symbols awaiting a summary, most valuable first.
+
+        Top-level functions come first, then classes, then everything else; within each group
+        symbols called from more places in the project go first. The ranking is taken once; each page
+        leaves out symbols summarized since then.
+        """
+        with self.conn:
+            self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS pending_rank (symbol_id INTEGER NOT NULL)")
+            self.conn.execute("DELETE FROM pending_rank")
+            # Rowids follow the insert order, so they double as rank and as the paging cursor
+            self.conn.execute(
+                "INSERT INTO pending_rank (symbol_id) SELECT s.id FROM symbols s "
+                "LEFT JOIN (SELECT callee, COUNT(*) AS n FROM calls "
+                "WHERE callee IN (SELECT name FROM symbols WHERE pending = 1) GROUP BY callee) c ON c.callee = s.name "
+                "WHERE s.pending = 1 ORDER BY "
+                "CASE WHEN s.type = 'function' AND instr(s.breadcrumb, ' > ') = 0 THEN 0 "
+                "WHEN s.type = 'class' THEN 1 ELSE 2 END, coalesce(c.n, 0) DESC, s.path, s.line_start"
+            )
+        last = 0
+        while True:
+            rows = self.conn.execute(
+                "SELECT r.rowid, s.path, s.name, s.line_start FROM pending_rank r JOIN symbols s ON s.id = r.symbol_id "
+                "WHERE r.rowid > ? AND s.pending = 1 ORDER BY r.rowid LIMIT ?", (last, page_size)
+            ).fetchall()
+            if not rows:
+                return
+            last = rows[-1][0]
+            yield [(path, name, line_start) for _, path, name, line_start in rows]
+
+    def pending_count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM symbols WHERE pending = 1").fetchone()[0]
+
+    def delete(self, rel_path: str):
+        with self.conn:
+            self.conn.execute("DELETE FROM files WHERE path = ?", (rel_path,))
+            self._unindex(rel_path)
+
+    def rename(self, old_path: str, new_path: str) -> bool:
+        """Moves a row to a new path, keeping its symbols; returns whether old_path was registered."""
+        with self.conn:
+            self.conn.execute("DELETE FROM files WHERE path = ?", (new_path,))
+            self._unindex(new_path)
+            if self._tracking:
+                # The definitions now live elsewhere, which changes how calls to them resolve
+                self.conn.execute("INSERT OR IGNORE INTO changed_names (name) SELECT name FROM symbols WHERE path = ?",
+                                  (old_path,))
+            # Clear mtime so the moved file is hashed once before its stat data is trusted again
+            cursor = self.conn.execute("UPDATE files SET path = ?, mtime_ns = NULL WHERE path = ?", (new_path, old_path))
+            self.conn.execute("UPDATE symbols SET path = ?, folder = ? WHERE path = ?",
+                              (new_path, posixpath.dirname(new_path) or ".", old_path))
+        return cursor.rowcount > 0
+
+    def _row_to_entry(self, row) -> Dict:
+        entry = {
+            "hash": row[0],
+            "mtime_ns": row[1],
+            "size": row[2],
+            "inode": row[3],
+            "dependencies": json.loads(row[4]),
+            "symbols": json.loads(row[5]),
+        }
+        if row[6] is not None:
+            entry["note"] = row[6]
+        return entry
+
+    def entries(self) -> Iterator[Tuple[str, Dict]]:
+        for row in self.conn.execute(
+            f"SELECT {ENTRY_COLUMNS}, path FROM files ORDER BY path"
+        ):
+            yield row[7], self._row_to_entry(row)
+
+    def folder_entries(self, folder_rel: str) -> List[Tuple[str, Dict]]:
+        """Entries for the files directly inside a folder ("." for the root), ordered by path."""
+        if folder_rel == ".":
+            rows = self.conn.execute(
+                f"SELECT {ENTRY_COLUMNS}, path FROM files "
+                "WHERE path NOT LIKE '%/%' ORDER BY path"
+            ).fetchall()
+        else:
+            # Range scan on the primary key: every path starting with "folder/" ('0' sorts right after '/')
+            rows = self.conn.execute(
+                f"SELECT {ENTRY_COLUMNS}, path FROM files "
+                "WHERE path > ? AND path < ? ORDER BY path",
+                (folder_rel + "/", folder_rel + "0"),
+            ).fetchall()
+            rows = [r for r in rows if "/" not in r[7][len(folder_rel) + 1:]]
+        return [(r[7], self._row_to_entry(r)) for r in rows]
+
+    def paths_under(self, folder_rel: str) -> List[str]:
+        """Every registered path below a folder, at any depth."""
+        rows = self.conn.execute(
+            "SELECT path FROM files WHERE path > ? AND path < ? ORDER BY path", (folder_rel + "/", folder_rel + "0")
+        ).fetchall()
+        return [r[0] for r in rows]
+
+    def definitions(self, name: str) -> List[Dict]:
+        """Every indexed definition of a symbol name."""
+        rows = self.conn.execute(
+            "SELECT path, name, type, breadcrumb, line_start, line_end FROM symbols WHERE name = ? "
+            "ORDER BY path, line_start", (name,)
+        ).fetchall()
+        return [dict(zip(SYMBOL_COLUMNS, r)) for r in rows]
+
+    def callee_definitions(self, folder_rel: str) -> Dict[str, List[Dict]]:
+        """definitions() of every name called from the folder's symbols, in one query."""
+        rows = self.conn.execute(
+            "SELECT path, name, type, breadcrumb, line_start, line_end FROM symbols WHERE name IN "
+            "(SELECT c.callee FROM symbols s JOIN calls c ON c.symbol_id = s.id WHERE s.folder = ?) "
+            "ORDER BY name, path, line_start", (folder_rel,)
+        )
+        definitions: Dict[str, List[Dict]] = {}
+        for r in rows:
+            definitions.setdefault(r[1], []).append(dict(zip(SYMBOL_COLUMNS, r)))
+        return definitions
+
+    def search(self, prefix: str, limit: int = 50) -> List[Dict]:
+        """Definitions whose name starts with prefix (an index range scan, not LIKE)."""
+        rows = self.conn.execute(
+            "SELECT path, name, type, breadcrumb, line_start, line_end FROM symbols WHERE name >= ? AND name < ? "
+            "ORDER BY name, path, line_start LIMIT ?", (prefix, prefix + "\U0010ffff", limit)
+        ).fetchall()
+        return [dict(zip(SYMBOL_COLUMNS, r)) for r in rows]
+
+    def callers(self, name: str) -> List[Dict]:
+        """Symbols whose body calls something named `name`."""
+        rows = self.conn.execute(
+            "SELECT s.path, s.name, s.type, s.breadcrumb, s.line_start, s.line_end FROM calls c "
+            "JOIN symbols s ON s.id = c.symbol_id WHERE c.callee = ? ORDER BY s.path, s.line_start", (name,)
+        ).fetchall()
+        return [dict(zip(SYMBOL_COLUMNS, r)) for r in rows]
+
+    def callees(self, rel_path: str, line_start: int) -> List[str]:
+        """Names called by the symbol defined at rel_path:line_start that are themselves defined somewhere."""
+        rows = self.conn.execute(
+            "SELECT DISTINCT c.callee FROM symbols s JOIN calls c ON c.symbol_id = s.id "
+            "WHERE s.path = ? AND s.line_start = ? AND EXISTS (SELECT 1 FROM symbols d WHERE d.name = c.callee) "
+            "ORDER BY c.callee", (rel_path, line_start)
+        ).fetchall()
+        return [r[0] for r in rows]
+
+    def known_callees(self, folder_rel: str) -> Set[str]:
+        """Names called from the files directly inside a folder that are defined somewhere in the index."""
+        rows = self.conn.execute(
+            "SELECT DISTINCT c.callee FROM symbols s JOIN calls c ON c.symbol_id = s.id "
+            "WHERE s.folder = ? AND EXISTS (SELECT 1 FROM symbols d WHERE d.name = c.callee)", (folder_rel,)
+        )
+        return {r[0] for r in rows}
+
+    def track_definitions(self):
+        """Starts recording the names whose definitions are added, moved or removed; see dependent_folders."""
+        self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS changed_names (name TEXT PRIMARY KEY)")
+        self.conn.execute("DELETE FROM changed_names")
+        self._tracking = True
+
+    def dependent_folders(self) -> Set[str]:
+        """Folders with calls to names whose definitions changed since track_definitions, which stops tracking.
+
+        Their "Uses" lists and resolved call targets may differ even though none of their files changed.
+        """
+        rows = self.conn.execute(
+            "SELECT DISTINCT s.path FROM changed_names n JOIN calls c ON c.callee = n.name "
+            "JOIN symbols s ON s.id = c.symbol_id"
+        )
+        folders = {posixpath.dirname(rel_path) or "." for (rel_path,) in rows}
+        self.conn.execute("DELETE FROM changed_names")
+        self._tracking = False
+        return folders
+
+    def begin_sweep(self):
+        """Starts tracking which paths a full scan still finds; see mark_seen and sweep."""
+        self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS seen (path TEXT PRIMARY KEY)")
+        self.conn.execute("DELETE FROM seen")
+
+    def mark_seen(self, rel_paths: List[str]):
+        self.conn.executemany("INSERT OR IGNORE INTO seen (path) VALUES (?)", [(p,) for p in rel_paths])
+
+    def sweep(self) -> List[str]:
+        """Deletes every row not marked seen since begin_sweep; returns the removed paths."""
+        gone = [r[0] for r in self.conn.execute("SELECT path FROM files WHERE path NOT IN (SELECT path FROM seen)")]
+        with self.conn:
+            for rel_path in gone:
+                self.conn.execute("DELETE FROM files WHERE path = ?", (rel_path,))
+                self._unindex(rel_path)
+            self.conn.execute("DELETE FROM seen")
+        return gone
+
+    def paths(self) -> Iterator[str]:
+        for (rel_path,) in self.conn.execute("SELECT path FROM files ORDER BY path"):
+            yield rel_path
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def remove(self):
+        """Deletes the registry database (and any legacy JSON registry) from disk."""
+        self.close()
+        removed = False
+        for path in (self.path, self.path.with_name(self.path.name + "-wal"),
+                     self.path.with_name(self.path.name + "-shm"), self.legacy_path):
+            if path.exists():
+                path.unlink()
+                removed = True
+        return removed
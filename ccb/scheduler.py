@@ -0,0 +1,203 @@
+import pathlib
+import posixpath
+import time
+from typing import Container, Dict, List, Optional, Set, Tuple
+from .config import config
+from .llm.prompt import PROMPT_VERSION, compact_code, compacts, direct_members, estimate_tokens
+from .parsers.base import load_code
+
+# Pending symbols are loaded, submitted and applied this many at a time
+WINDOW = 256
+
+# (name, line_start) of a symbol within its file
+Target = Tuple[str, int]
+
+
+class Budget:
+    """Per-run limits on LLM requests, estimated code tokens and wall-clock seconds (0 = unlimited).
+
+    A batched request counts once; retries and per-symbol fallbacks for malformed batch answers don't count.
+    """
+
+    def __init__(self, requests: Optional[int] = None, tokens: Optional[int] = None, seconds: Optional[float] = None):
+        self.requests = config.llm.max_requests if requests is None else requests
+        self.tokens = config.llm.max_tokens if tokens is None else tokens
+        self.seconds = config.llm.time_budget if seconds is None else seconds
+        self.used_requests = 0
+        self.used_tokens = 0
+        self.started = time.monotonic()
+
+    def allows(self, tokens: int) -> bool:
+        if self.requests and self.used_requests >= self.requests:
+            return False
+        if self.tokens and self.used_tokens + tokens > self.tokens:
+            return False
+        return not self.seconds or time.monotonic() - self.started < self.seconds
+
+    def charge(self, tokens: int):
+        self.used_requests += 1
+        self.used_tokens += tokens
+
+
+class SummaryScheduler:
+    """Summarizes the registry's pending symbols, most valuable first, until the budget runs out.
+
+    Ranking comes from Registry.pending (top-level functions, then classes, then the rest, each by how
+    often they are called). Whatever is left stays pending in the registry, so later runs pick it up
+    even when no file changed.
+    """
+
+    def __init__(self, scanner, budget: Optional[Budget] = None):
+        self.scanner = scanner
+        self.budget = budget or Budget()
+        self.summarizer = None
+        self.parsed: Container[str] = ()
+        self.summarized = 0
+        self.exhausted = False
+
+    def run(self, root: pathlib.Path, parsed: Container[str] = ()) -> Set[str]:
+        """Returns the folders whose files received summaries.
+
+        `parsed` holds the files the caller just parsed and already looked up in the summary cache.
+        """
+        self.parsed = parsed
+        dirty: Set[str] = set()
+        with self.scanner.metrics.phase("registry"):
+            count = self.scanner.registry.pending_count()
+        if not count:
+            return dirty
+        if not self.scanner.llm.configured:
+            print(f"No LLM endpoint configured (LLM_BASE_URL); {count} symbols left unsummarized.")
+            return dirty
+
+        from .llm.summarizer import AsyncSummarizer  # httpx only when there is something to summarize
+
+        m = self.scanner.metrics
+        self.summarizer = AsyncSummarizer(self.scanner.llm, metrics=m)
+        try:
+            for window in m.timed("registry", self.scanner.registry.pending(WINDOW)):
+                self._run_window(root, window, dirty)
+                if self.exhausted or self.summarizer.unavailable:
+                    break
+        finally:
+            self.summarizer.close()
+
+        remaining = self.scanner.registry.pending_count()
+        m.count("llm_summarized", self.summarized)
+        m.count("llm_pending", remaining)
+        if remaining and self.exhausted:
+            print(f"LLM budget reached: {remaining} symbols still pending, the next scan continues with them.")
+        return dirty
+
+    def _run_window(self, root: pathlib.Path, window: List[Tuple[str, str, int]], dirty: Set[str]):
+        registry, cache, llm = self.scanner.registry, self.scanner.summary_cache, self.scanner.llm
+        # Requests are per file, so group the window by path (in order of each path's best symbol)
+        by_path: Dict[str, List[Target]] = {}
+        for rel_path, name, line_start in window:
+            by_path.setdefault(rel_path, []).append((name, line_start))
+
+        m = self.scanner.metrics
+        submitted, deferred = [], []
+        for rel_path, wanted in by_path.items():
+            with m.phase("registry"):
+                entry = registry.get(rel_path)
+            try:
+                with m.phase("read"):
+                    source = (root / rel_path).read_bytes()
+            except OSError:
+                continue
+            with m.phase("hash"):
+                file_hash = self.scanner.get_hash(source)
+            # Edited since it was parsed: the next scan re-parses it and records fresh pending symbols
+            if entry is None or file_hash != entry["hash"]:
+                continue
+
+            symbols = {(s["name"], s.get("line_start")): s for s in entry["symbols"]}
+            # A class sent as a skeleton lists its members with their summaries, so its undocumented
+            # members are summarized first, even when they rank below this window
+            wanted = list(dict.fromkeys(wanted + self._members(source, symbols, entry["symbols"], wanted)))
+            hits, misses = {}, []
+            for target in wanted:
+                s = symbols.get(target)
+                # Gone, or summarized earlier in this run as another class's member
+                if s is None or s.get("summary"):
+                    continue
+                code = load_code(source, s)
+                key = cache.key(code, llm.name, config.llm.model, PROMPT_VERSION)
+                # Left over from an earlier run: another file may have produced the summary since
+                with m.phase("summary_cache"):
+                    summary = cache.get(key) if rel_path not in self.parsed else None
+                if summary:
+                    hits[target] = s["summary"] = summary
+                else:
+                    misses.append((target, key, code))
+            if hits:
+                with m.phase("registry"):
+                    registry.set_summaries(rel_path, hits)
+                dirty.add(posixpath.dirname(rel_path) or ".")
+
+            missing = {target for target, _, _ in misses}
+            later = [miss for miss in misses if compacts(miss[2]) and any(
+                (s["name"], s.get("line_start")) in missing for s in direct_members(symbols[miss[0]], entry["symbols"]))]
+            if later:
+                misses = [miss for miss in misses if miss not in later]
+                deferred.append((rel_path, source, entry, symbols, later))
+            self._submit(rel_path, source, entry, symbols, misses, submitted)
+            if self.exhausted:
+                break
+        self._collect(submitted, dirty)
+
+        # Second round: skeletons of the classes whose members were just summarized
+        submitted = []
+        for rel_path, source, entry, symbols, misses in deferred:
+            if self.exhausted or self.summarizer.unavailable:
+                break
+            self._submit(rel_path, source, entry, symbols, misses, submitted)
+        self._collect(submitted, dirty)
+
+    def _members(self, source: bytes, symbols: Dict[Target, Dict], entries: List[Dict],
+                 wanted: List[Target]) -> List[Target]:
+        """Unsummarized public members of the wanted symbols that will be sent as skeletons."""
+        members = []
+        for target in wanted:
+            s = symbols.get(target)
+            if s is None or s.get("summary") or not compacts(load_code(source, s)):
+                continue
+            members.extend((member["name"], member.get("line_start")) for member in direct_members(s, entries)
+                           if member.get("is_public") and not member.get("summary"))
+        return members
+
+    def _submit(self, rel_path: str, source: bytes, entry: Dict, symbols: Dict[Target, Dict],
+                misses: List[Tuple[Target, str, str]], submitted: List):
+        from .llm.summarizer import plan_batches
+
+        # Keys stay on the full code; the LLM sees a skeleton of long symbols, with the members
+        # summarized so far as one-liners
+        prompts = [compact_code(source, symbols[target], entry["symbols"], rel_path) for target, _, _ in misses]
+        offset = 0
+        for batch in plan_batches([(target[0], prompt) for (target, _, _), prompt in zip(misses, prompts)],
+                                  config.llm.batch_size, config.llm.batch_max_tokens):
+            tokens = sum(estimate_tokens(prompt) for _, prompt in batch)
+            if not self.budget.allows(tokens):
+                self.exhausted = True
+                break
+            self.budget.charge(tokens)
+            future = self.summarizer.submit_batch(rel_path, batch)
+            submitted.append((rel_path, symbols, misses[offset:offset + len(batch)], future))
+            offset += len(batch)
+
+    def _collect(self, submitted: List, dirty: Set[str]):
+        cache, registry = self.scanner.summary_cache, self.scanner.registry
+        for rel_path, symbols, targets, future in submitted:
+            with self.scanner.metrics.phase("llm_wait"):
+                results = future.result()
+            summaries = {}
+            for (target, key, _), summary in zip(targets, results):
+                if summary:
+                    print(f"  Summarized {target[0]} via LLM.")
+                    cache.put(key, summary)
+                    summaries[target] = symbols[target]["summary"] = summary
+            if summaries:
+                self.summarized += len(summaries)
+                registry.set_summaries(rel_path, summaries)
+                dirty.add(posixpath.dirname(rel_path) or ".")
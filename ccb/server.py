@@ -0,0 +1,212 @@
+import contextlib
+import io
+import json
+import os
+import pathlib
+import queue
+import socket
+import socketserver
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+from .config import config
+from .core import Scanner
+from .registry import Registry
+
+# One JSON object per line in each direction; a connection carries one request
+MAX_REQUEST_BYTES = 1 << 20
+
+
+class Service:
+    """The warm state behind `ccb serve`: one Scanner (registry, summary cache, LLM client) and one
+    watch session (parsers and the parse trees of rescanned files) reused across requests.
+
+    Methods run on a single worker thread, so the SQLite connections stay on the thread that opened them.
+    """
+
+    def __init__(self, root: pathlib.Path, use_gitignore: Optional[bool] = None):
+        from .watch import WatchSession
+
+        self.root = root
+        self.scanner = Scanner()
+        self.session = WatchSession(self.scanner, root, use_gitignore=use_gitignore)
+
+    def scan(self, path: str, gitignore: Optional[bool] = None, jobs: Optional[int] = None,
+             since: Optional[str] = None, stats: bool = False, metrics_json: Optional[str] = None) -> Dict:
+        from .metrics import Metrics
+
+        self.scanner.metrics = Metrics(enabled=stats or bool(metrics_json))
+        self.scanner.scan(path, use_gitignore=gitignore, jobs=jobs, since=since)
+        # Parse trees from before the scan may no longer match the files
+        self.session.trees.clear()
+        if stats:
+            self.scanner.metrics.print_report()
+        if metrics_json:
+            self.scanner.metrics.write_json(metrics_json)
+            print(f"Metrics written to {metrics_json}")
+        return {}
+
+    def rescan(self, paths: List[str]) -> Dict:
+        """Re-indexes the given files (or deleted paths) incrementally and refreshes their folders."""
+        changed = set()
+        for path in paths:
+            path = pathlib.Path(path).absolute()
+            try:
+                path.relative_to(self.root)
+            except ValueError:
+                raise ValueError(f"{path} is outside {self.root}")
+            if self.session.accepts(path):
+                changed.add(path)
+        written = self.session.apply(changed) if changed else 0
+        return {"files": len(changed), "written": written}
+
+    def idle(self):
+        # Background summaries from rescans land between requests
+        self.session.apply_summaries()
+
+    def close(self):
+        # Summaries requested by rescans are applied before the summarizer goes away
+        self.session.flush()
+        if self.session.summarizer is not None:
+            self.session.summarizer.close()
+        self.scanner.summary_cache.close()
+        self.scanner.registry.close()
+
+
+def run_query(registry: Registry, name: str, prefix: bool = False) -> Any:
+    from .query import lookup
+
+    return registry.search(name) if prefix else lookup(registry, name)
+
+
+class Daemon:
+    """Serves scan, rescan and query requests on a Unix domain socket.
+
+    Connections are handled on their own threads. Queries open a read-only registry connection per
+    request and never wait on writers (WAL). Scans and rescans are queued to the single worker thread
+    that owns the Service and take the project write lock, so clients never render the same context
+    file at the same time.
+    """
+
+    def __init__(self, root: pathlib.Path, socket_path: Optional[pathlib.Path] = None,
+                 use_gitignore: Optional[bool] = None):
+        self.root = root.absolute()
+        self.socket_path = socket_path or pathlib.Path(config.socket_path)
+        self.use_gitignore = use_gitignore
+        self.jobs: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self.server: Optional[socketserver.ThreadingUnixStreamServer] = None
+
+    def submit(self, fn: Callable[..., Dict], **params) -> Future:
+        future: Future = Future()
+        self.jobs.put((fn, params, future))
+        return future
+
+    def _work(self, ready: threading.Event):
+        service = Service(self.root, self.use_gitignore)
+        ready.set()
+        try:
+            while True:
+                try:
+                    job = self.jobs.get(timeout=0.5)
+                except queue.Empty:
+                    service.idle()
+                    continue
+                if job is None:
+                    return
+                fn, params, future = job
+                output = io.StringIO()
+                try:
+                    with contextlib.redirect_stdout(output):
+                        result = fn(service, **params)
+                    future.set_result({"ok": True, "result": result, "output": output.getvalue()})
+                except Exception as e:
+                    future.set_result({"ok": False, "error": str(e), "output": output.getvalue()})
+        finally:
+            service.close()
+
+    def handle(self, request: Dict) -> Dict:
+        op = request.get("op")
+        params = request.get("params") or {}
+        if op == "ping":
+            return {"ok": True, "result": {"pid": os.getpid(), "root": str(self.root)}}
+        if op == "query":
+            # The worker's Service already created and upgraded the database
+            registry = Registry(readonly=True)
+            if not registry.path.exists():
+                return {"ok": False, "error": "No index found; run 'ccb scan' first."}
+            try:
+                return {"ok": True, "result": run_query(registry, params["name"], params.get("prefix", False))}
+            finally:
+                registry.close()
+        if op == "scan":
+            return self.submit(Service.scan, **params).result()
+        if op == "rescan":
+            return self.submit(Service.rescan, **params).result()
+        if op == "shutdown":
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+            return {"ok": True, "result": {}}
+        return {"ok": False, "error": f"unknown request {op!r}"}
+
+    def _handler(self):
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                line = self.rfile.readline(MAX_REQUEST_BYTES)
+                try:
+                    response = daemon.handle(json.loads(line))
+                except (ValueError, KeyError, TypeError) as e:
+                    response = {"ok": False, "error": f"bad request: {e}"}
+                self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+        return Handler
+
+    def serve_forever(self):
+        if request("ping", socket_path=self.socket_path) is not None:
+            raise RuntimeError(f"ccb serve is already running on {self.socket_path}")
+        # Left behind by a daemon that didn't shut down cleanly
+        self.socket_path.unlink(missing_ok=True)
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+
+        ready = threading.Event()
+        worker = threading.Thread(target=self._work, args=(ready,), name="ccb-serve-worker", daemon=True)
+        worker.start()
+        ready.wait()
+        # Bring everything up to date (and load the grammars) before accepting requests
+        response = self.submit(Service.scan, path=str(self.root)).result()
+        print(response["output"], end="")
+        if not response["ok"]:
+            print(f"Initial scan failed: {response['error']}")
+
+        self.server = socketserver.ThreadingUnixStreamServer(str(self.socket_path), self._handler())
+        self.server.daemon_threads = True
+        print(f"Serving {self.root} on {self.socket_path} (pid {os.getpid()}). Press Ctrl-C to stop.")
+        try:
+            self.server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.server.server_close()
+            self.socket_path.unlink(missing_ok=True)
+            self.jobs.put(None)
+            worker.join()
+            print("Stopped serving.")
+
+
+def request(op: str, socket_path: Optional[pathlib.Path] = None, **params) -> Optional[Dict]:
+    """Sends one request to a running daemon; returns None when none is listening."""
+    path = socket_path or pathlib.Path(config.socket_path)
+    if not path.exists():
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        try:
+            sock.connect(str(path))
+        except (ConnectionRefusedError, FileNotFoundError):
+            return None
+        sock.sendall(json.dumps({"op": op, "params": params}).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as f:
+            line = f.readline()
+        return json.loads(line) if line else None
+    finally:
+        sock.close()
@@ -0,0 +1,116 @@
+import os
+import pathlib
+from typing import Iterator, List, Tuple
+import pathspec
+
+
+class Walker:
+    """Single-pass directory walker that prunes excluded folders before descending."""
+
+    def __init__(self, include: List[str], exclude: List[str], use_gitignore: bool = False):
+        include = [p.strip() for p in include if p.strip()]
+        exclude = [p.strip() for p in exclude if p.strip()]
+        self.include_spec = pathspec.PathSpec.from_lines('gitwildmatch', include)
+        self.exclude_spec = pathspec.PathSpec.from_lines('gitwildmatch', exclude)
+        self.use_gitignore = use_gitignore
+        self._root_ignores = None
+
+        # Fast path: "**/*.ext" patterns only need a suffix check
+        self.include_suffixes = None
+        if include and all(p.startswith("**/*.") and "/" not in p[3:] and "*" not in p[4:] for p in include):
+            self.include_suffixes = tuple(p[4:] for p in include)
+
+    def walk(self, root: pathlib.Path, rel_root: str = "",
+             include_empty: bool = False) -> Iterator[Tuple[pathlib.Path, List[pathlib.Path]]]:
+        """Yields (folder, files) for every folder containing candidate files, in sorted depth-first order.
+
+        rel_root is root's path relative to the project root when walking a subfolder, so exclude
+        patterns still see full relative paths. include_empty also yields folders without candidates.
+        """
+        root_ignores = self._load_gitignore(root, rel_root)
+        stack = [(root, rel_root, root_ignores)]
+        while stack:
+            folder, rel_folder, ignores = stack.pop()
+            try:
+                with os.scandir(folder) as it:
+                    entries = sorted(it, key=lambda e: e.name)
+            except OSError:
+                continue
+
+            files = []
+            subdirs = []
+            for entry in entries:
+                if entry.name.startswith('.'):
+                    continue
+                rel = f"{rel_folder}/{entry.name}" if rel_folder else entry.name
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    continue
+
+                if is_dir:
+                    if self.exclude_spec.match_file(rel + "/") or self._ignored(ignores, rel + "/"):
+                        continue
+                    subdirs.append((entry, rel))
+                elif entry.is_file():
+                    if not self._included(rel):
+                        continue
+                    if self.exclude_spec.match_file(rel) or self._ignored(ignores, rel):
+                        continue
+                    files.append(pathlib.Path(entry.path))
+
+            if files or include_empty:
+                yield folder, files
+
+            # Push in reverse so the lexicographically first subfolder is visited next
+            for entry, rel in reversed(subdirs):
+                sub_ignores = ignores
+                if self.use_gitignore:
+                    spec = self._load_gitignore(pathlib.Path(entry.path), rel)
+                    if spec:
+                        sub_ignores = ignores + spec
+                stack.append((pathlib.Path(entry.path), rel, sub_ignores))
+
+    def accepts(self, root: pathlib.Path, rel: str) -> bool:
+        """Whether a single file (path relative to root) is a scan candidate.
+
+        Only the root .gitignore is consulted here; nested ones are applied during full walks.
+        """
+        parts = rel.split('/')
+        if parts[-1].startswith('.') or not self.accepts_folder(root, '/'.join(parts[:-1])):
+            return False
+        return self._included(rel) and not self.exclude_spec.match_file(rel) and not self._ignored(self._root_ignores, rel)
+
+    def accepts_folder(self, root: pathlib.Path, rel_folder: str) -> bool:
+        """Whether a folder (relative to root, "" for root itself) survives pruning."""
+        if self._root_ignores is None:
+            self._root_ignores = self._load_gitignore(root, "")
+        parts = rel_folder.split('/') if rel_folder else []
+        for i in range(1, len(parts) + 1):
+            folder = '/'.join(parts[:i]) + '/'
+            if parts[i - 1].startswith('.') or self.exclude_spec.match_file(folder) or self._ignored(self._root_ignores, folder):
+                return False
+        return True
+
+    def _included(self, rel: str) -> bool:
+        if self.include_suffixes is not None:
+            return rel.endswith(self.include_suffixes)
+        return self.include_spec.match_file(rel)
+
+    def _load_gitignore(self, folder: pathlib.Path, rel_folder: str) -> List[Tuple[str, pathspec.PathSpec]]:
+        if not self.use_gitignore:
+            return []
+        gitignore = folder / ".gitignore"
+        try:
+            with open(gitignore, "r", encoding="utf-8") as f:
+                spec = pathspec.GitIgnoreSpec.from_lines(f)
+        except OSError:
+            return []
+        prefix = f"{rel_folder}/" if rel_folder else ""
+        return [(prefix, spec)]
+
+    def _ignored(self, ignores: List[Tuple[str, pathspec.PathSpec]], rel: str) -> bool:
+        for prefix, spec in ignores:
+            if rel.startswith(prefix) and spec.match_file(rel[len(prefix):]):
+                return True
+        return False
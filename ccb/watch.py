@@ -0,0 +1,443 @@
+import ctypes
+import ctypes.util
+import os
+import pathlib
+import queue
+import select
+import struct
+import sys
+import time
+from typing import Dict, List, Optional, Set, Tuple
+from .config import config
+from .core import Scanner
+from .ingest import SIGNATURES, SKIP, decode_check, triage
+from .locking import write_lock
+from .llm.prompt import PROMPT_VERSION, compact_code, compacts, direct_members
+from .parsers import get_parser
+from .parsers.base import load_code
+from .walker import Walker
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MODIFY | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+EVENT = struct.Struct("iIII")
+
+
+class InotifyWatcher:
+    """Linux inotify watcher (via libc, no extra dependency) over every non-pruned folder."""
+
+    def __init__(self, root: pathlib.Path, walker: Walker):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self.root = root
+        self.walker = walker
+        self.dirs: Dict[int, pathlib.Path] = {}
+        self.overflowed = False
+        for folder, _ in walker.walk(root, include_empty=True):
+            self._watch(folder)
+
+    def _watch(self, folder: pathlib.Path):
+        wd = self._add_watch(self.fd, os.fsencode(folder), WATCH_MASK)
+        if wd >= 0:
+            self.dirs[wd] = folder
+
+    def poll(self, timeout: float) -> Set[pathlib.Path]:
+        """Waits up to timeout for events; returns created, modified or deleted paths."""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        changed: Set[pathlib.Path] = set()
+        if not readable:
+            return changed
+
+        while True:
+            try:
+                data = os.read(self.fd, 1 << 16)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT.unpack_from(data, offset)
+                name = data[offset + EVENT.size:offset + EVENT.size + length].rstrip(b"\0")
+                offset += EVENT.size + length
+
+                if mask & IN_Q_OVERFLOW:
+                    self.overflowed = True
+                    continue
+                if mask & IN_IGNORED:
+                    self.dirs.pop(wd, None)
+                    continue
+                folder = self.dirs.get(wd)
+                if folder is None or not name:
+                    continue
+                path = folder / os.fsdecode(name)
+                if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                    # New folder: watch it (and anything already inside) and report its files
+                    rel = path.relative_to(self.root).as_posix()
+                    if self.walker.accepts_folder(self.root, rel):
+                        for sub, files in self.walker.walk(path, rel_root=rel, include_empty=True):
+                            self._watch(sub)
+                            changed.update(files)
+                else:
+                    changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Portable fallback: re-walks the tree and compares stat data every interval."""
+
+    def __init__(self, root: pathlib.Path, walker: Walker, interval: float = 0.5):
+        self.root = root
+        self.walker = walker
+        self.interval = interval
+        self.overflowed = False
+        self.snapshot = self._snapshot()
+        self.last_poll = time.monotonic()
+
+    def _snapshot(self) -> Dict[pathlib.Path, Tuple[int, int, int]]:
+        snapshot = {}
+        for _, files in self.walker.walk(self.root):
+            for f in files:
+                try:
+                    st = f.stat()
+                except OSError:
+                    continue
+                snapshot[f] = (st.st_mtime_ns, st.st_size, st.st_ino)
+        return snapshot
+
+    def poll(self, timeout: float) -> Set[pathlib.Path]:
+        wait = self.last_poll + self.interval - time.monotonic()
+        if wait > timeout:
+            time.sleep(timeout)
+            return set()
+        if wait > 0:
+            time.sleep(wait)
+        self.last_poll = time.monotonic()
+        current = self._snapshot()
+        changed = {p for p, sig in current.items() if self.snapshot.get(p) != sig}
+        changed.update(p for p in self.snapshot if p not in current)
+        self.snapshot = current
+        return changed
+
+    def close(self):
+        pass
+
+
+def compute_edit(old: bytes, new: bytes) -> Dict:
+    """Tree.edit arguments describing old -> new as one replaced span (common prefix/suffix trimmed)."""
+    old_view, new_view = memoryview(old), memoryview(new)
+    limit = min(len(old), len(new))
+
+    # Binary search on slice equality keeps the comparison in C even for multi-MB files
+    lo, hi = 0, limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if old_view[:mid] == new_view[:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    prefix = lo
+
+    lo, hi = 0, limit - prefix
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if old_view[len(old) - mid:] == new_view[len(new) - mid:]:
+            lo = mid
+        else:
+            hi = mid - 1
+    suffix = lo
+
+    def point(data: bytes, byte: int) -> Tuple[int, int]:
+        row = data.count(b"\n", 0, byte)
+        return row, byte - (data.rfind(b"\n", 0, byte) + 1)
+
+    return {
+        "start_byte": prefix,
+        "old_end_byte": len(old) - suffix,
+        "new_end_byte": len(new) - suffix,
+        "start_point": point(old, prefix),
+        "old_end_point": point(old, len(old) - suffix),
+        "new_end_point": point(new, len(new) - suffix),
+    }
+
+
+class WatchSession:
+    """Keeps parse trees in memory and refreshes registry rows and context files as files are saved."""
+
+    def __init__(self, scanner: Scanner, root: pathlib.Path, debounce: float = 0.05,
+                 use_polling: bool = False, use_gitignore: Optional[bool] = None):
+        self.scanner = scanner
+        self.root = root
+        self.debounce = debounce
+        self.use_polling = use_polling
+        self.use_gitignore = config.respect_gitignore if use_gitignore is None else use_gitignore
+        self.walker = Walker(config.include, config.exclude, self.use_gitignore)
+        # rel_path -> (source, tree) of every file reparsed during this session
+        self.trees: Dict[str, Tuple[bytes, object]] = {}
+        self.summarizer = None
+        self.finished: queue.SimpleQueue = queue.SimpleQueue()
+        # Batches submitted but not yet taken off `finished`
+        self.in_flight = 0
+        # rel_path -> (hash, source, skeleton misses, member indices still in flight): classes sent as
+        # skeletons once their members' summaries are back
+        self.deferred: Dict[str, Tuple[str, bytes, List[Tuple[int, str, str]], Set[int]]] = {}
+        self.max_wait = max(1.0, debounce * 10)
+
+    def run(self):
+        # Bring the registry and every context file up to date before going incremental
+        self.scanner.scan(str(self.root), use_gitignore=self.use_gitignore)
+
+        watcher = None
+        if not self.use_polling:
+            try:
+                watcher = InotifyWatcher(self.root, self.walker)
+            except OSError as e:
+                print(f"inotify unavailable ({e}); falling back to polling.")
+        if watcher is None:
+            watcher = PollingWatcher(self.root, self.walker)
+        print(f"Watching {self.root} ({type(watcher).__name__}). Press Ctrl-C to stop.")
+
+        pending: Set[pathlib.Path] = set()
+        first_event = last_event = 0.0
+        try:
+            while True:
+                timeout = self.debounce if pending else 0.5
+                changed = watcher.poll(timeout)
+                now = time.monotonic()
+                if watcher.overflowed:
+                    # Events were dropped; only a full scan can recover
+                    watcher.overflowed = False
+                    pending.clear()
+                    self.scanner.scan(str(self.root), use_gitignore=self.use_gitignore)
+                    self.trees.clear()
+                    continue
+
+                changed = {p for p in changed if self.accepts(p)}
+                if changed:
+                    if not pending:
+                        first_event = now
+                    pending |= changed
+                    last_event = now
+
+                # Debounce: wait for a quiet period, but never hold a burst longer than max_wait
+                if pending and (now - last_event >= self.debounce or now - first_event >= self.max_wait):
+                    start = time.perf_counter()
+                    written = self.apply(pending)
+                    elapsed = (time.perf_counter() - start) * 1000
+                    print(f"[watch] {len(pending)} change(s), {written} context file(s) updated in {elapsed:.1f} ms")
+                    pending = set()
+                self.apply_summaries()
+        except KeyboardInterrupt:
+            print("Stopped watching.")
+        finally:
+            watcher.close()
+            if self.summarizer is not None:
+                self.summarizer.close()
+            self.scanner.summary_cache.close()
+
+    def accepts(self, path: pathlib.Path) -> bool:
+        try:
+            rel = path.relative_to(self.root).as_posix()
+        except ValueError:
+            return False
+        if self.walker.accepts(self.root, rel):
+            return True
+        # A deleted folder can't be matched against include patterns; check what the registry holds under it
+        return not path.exists() and bool(self.scanner.registry.paths_under(rel))
+
+    def apply(self, paths: Set[pathlib.Path]) -> int:
+        """Re-indexes changed or deleted paths and refreshes their folders; returns the context files rewritten."""
+        dirty: Set[str] = set()
+        with write_lock:
+            for path in sorted(paths):
+                rel = path.relative_to(self.root).as_posix()
+                if path.is_file():
+                    if self.update_file(path, rel):
+                        dirty.add(self._folder(rel))
+                else:
+                    dirty.update(self.remove(rel))
+
+            written = sum(self.scanner.refresh_folder(self.root, folder) for folder in sorted(dirty))
+            self.scanner.save_export(self.root)
+        return written
+
+    def _folder(self, rel: str) -> str:
+        return rel.rsplit("/", 1)[0] if "/" in rel else "."
+
+    def update_file(self, path: pathlib.Path, rel: str) -> bool:
+        """Incrementally reparses one file and stores its symbols; returns whether anything changed."""
+        parser = get_parser(path.suffix)
+        if parser is None:
+            return False
+        try:
+            st = path.stat()
+            source = path.read_bytes()
+        except OSError:
+            return False
+
+        file_hash = self.scanner.get_hash(source)
+        cached = self.scanner.registry.stat(rel)
+        if cached and cached["hash"] == file_hash:
+            cached.update(self.scanner._stat_fields(st))
+            self.scanner.registry.update_stat(rel, cached)
+            return False
+
+        # Same size limits and generated-file handling as scan
+        mode, note = triage(source, len(source))
+        if mode == SKIP:
+            self.trees.pop(rel, None)
+            record = {"hash": file_hash, **self.scanner._stat_fields(st), "dependencies": [], "symbols": [], "note": note}
+            self.scanner.registry.put(rel, record)
+            return True
+        try:
+            decode_check(source)  # non-UTF-8 files are skipped, as in scan
+        except UnicodeDecodeError:
+            return False
+
+        previous = self.trees.get(rel)
+        if previous is not None:
+            old_source, old_tree = previous
+            old_tree.edit(**compute_edit(old_source, source))
+            tree = parser.parse_tree(source, old_tree)
+        else:
+            tree = parser.parse_tree(source)
+        self.trees[rel] = (source, tree)
+        symbols, dependencies = parser.extract_all(tree, source)
+        if mode == SIGNATURES:
+            for s in symbols:
+                s.calls = []
+        symbols = [s.to_dict() for s in symbols]
+
+        # Unchanged symbols resolve from the summary cache; only edited ones go to the LLM
+        misses: List[Tuple[int, str, str]] = []
+        for i, s in enumerate(symbols):
+            if s.get("summary") or not s.get("is_public") or note:
+                continue
+            code = load_code(source, s)
+            key = self.scanner.summary_cache.key(code, self.scanner.llm.name, config.llm.model, PROMPT_VERSION)
+            summary = self.scanner.summary_cache.get(key)
+            if summary:
+                s["summary"] = summary
+            else:
+                misses.append((i, key, code))
+
+        missing = {i for i, _, _ in misses}
+        index = {id(s): i for i, s in enumerate(symbols)}
+        later = [miss for miss in misses if compacts(miss[2]) and any(
+            index[id(m)] in missing for m in direct_members(symbols[miss[0]], symbols))]
+        self.deferred.pop(rel, None)
+        if later:
+            misses = [miss for miss in misses if miss not in later]
+            self.deferred[rel] = (file_hash, source, later, {i for i, _, _ in misses})
+
+        record = {"hash": file_hash, **self.scanner._stat_fields(st), "dependencies": dependencies, "symbols": symbols}
+        if note:
+            record["note"] = note
+        self.scanner.registry.put(rel, record)
+
+        if misses:
+            self._submit(rel, file_hash, source, symbols, misses)
+        return True
+
+    def _submit(self, rel: str, file_hash: str, source: bytes, symbols: List[Dict], misses: List[Tuple[int, str, str]]):
+        from .llm.summarizer import AsyncSummarizer, plan_batches
+
+        # Left pending in the registry; the next scan summarizes them once the provider works
+        if not self.scanner.llm.configured or (self.summarizer is not None and self.summarizer.unavailable):
+            return
+        if self.summarizer is None:
+            self.summarizer = AsyncSummarizer(self.scanner.llm)
+        # Keys stay on the full code; the LLM sees a skeleton of long symbols
+        items = [(symbols[i]["name"], compact_code(source, symbols[i], symbols, rel)) for i, _, _ in misses]
+        offset = 0
+        for batch in plan_batches(items, config.llm.batch_size, config.llm.batch_max_tokens):
+            targets = [(i, key) for i, key, _ in misses[offset:offset + len(batch)]]
+            offset += len(batch)
+            future = self.summarizer.submit_batch(rel, batch)
+            self.in_flight += 1
+            future.add_done_callback(lambda f, rel=rel, file_hash=file_hash, targets=targets:
+                                     self.finished.put((rel, file_hash, targets, f)))
+
+    def apply_summaries(self):
+        """Patches summaries that arrived since the last loop into the registry and re-renders their folders."""
+        if self.finished.empty():
+            return
+        with write_lock:
+            self._patch_summaries()
+
+    def flush(self):
+        """Waits for every summary still in flight (deferred skeletons included) and patches it in.
+
+        One-shot rescans call this before closing the summarizer, so their requests aren't thrown away.
+        """
+        if not self.in_flight:
+            return
+        with write_lock:
+            self._patch_summaries(wait=True)
+
+    def _patch_summaries(self, wait: bool = False):
+        dirty: Set[str] = set()
+        while True:
+            try:
+                rel, file_hash, targets, future = self.finished.get(block=wait and self.in_flight > 0)
+            except queue.Empty:
+                break
+            self.in_flight -= 1
+            entry = self.scanner.registry.get(rel)
+            results = future.result()
+            for (i, key), summary in zip(targets, results):
+                if summary:
+                    self.scanner.summary_cache.put(key, summary)
+            # The file may have been edited again meanwhile; its newer version will be summarized itself
+            if entry is None or entry["hash"] != file_hash:
+                continue
+            for (i, _), summary in zip(targets, results):
+                if summary:
+                    entry["symbols"][i]["summary"] = summary
+            self.scanner.registry.put(rel, entry)
+            dirty.add(self._folder(rel))
+
+            deferred = self.deferred.get(rel)
+            if deferred is not None and deferred[0] == file_hash:
+                deferred[3].difference_update(i for i, _ in targets)
+                if not deferred[3]:
+                    del self.deferred[rel]
+                    self._submit(rel, file_hash, deferred[1], entry["symbols"], deferred[2])
+
+        for folder in sorted(dirty):
+            self.scanner.refresh_folder(self.root, folder)
+        if dirty:
+            self.scanner.save_export(self.root)
+
+    def remove(self, rel: str) -> Set[str]:
+        """Drops registry rows for a deleted file or folder; returns the folders needing a refresh."""
+        entry = self.scanner.registry.get(rel)
+        paths = [rel] if entry is not None else self.scanner.registry.paths_under(rel)
+        dirty = set()
+        for path in paths:
+            entry = self.scanner.registry.get(path)
+            if entry is None:
+                continue
+            self.scanner.registry.delete(path)
+            self.trees.pop(path, None)
+            self.deferred.pop(path, None)
+            dirty.add(self._folder(path))
+        return dirty